@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+Chess engine library: board representation and move generation, evaluation and search.
+Importing it has no side effects, lookup tables are created when the first board is set up.
+The terminal interface is in Chess.py.
+"""
+
+from .pieces import Colour, Piece, Pawn, Knight, Bishop, Rook, Queen, King
+from .board import ChessBoard, MoveData, getSquareName, getMoveName, parseMoveName
+from .evaluation import PieceSquareTables, PawnHashTable, EvaluationCache
+from .config import EngineConfig
+from .search import TimeManager, Engine, Ponderer
+from .analysiscache import AnalysisCache
+from .transposition import TranspositionTable, readGames
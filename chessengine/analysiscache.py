@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Persistent cache of search results, kept in an SQLite database so that it is reused across sessions
+"""
+
+import sqlite3
+
+#Stores the deepest search result (depth, valuation, principal variation) per position and search settings,
+#keyed by the position's Zobrist hash (including side to move, castling rights and en passant file), the quiescence limit and the extension limit.
+#Only results of searches without random evaluation variations are to be stored (see Engine.storeAnalysis).
+#The number of entries is bounded by maxEntries; least recently used entries are evicted first.
+#The position history is not part of the key, i.e. repetitions and the fifty-move rule are not taken into account.
+class AnalysisCache:
+
+    evictionShare = 0.1 #share of maxEntries evicted at once when the cache is full
+
+    def __init__(self, path, maxEntries = 100000):
+        self.path = path
+        self.maxEntries = maxEntries
+        #Several processes may share the file; the connection may be used by another thread (e.g. a ponder search), one thread at a time
+        self.connection = sqlite3.connect(path, timeout = 30, check_same_thread = False)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(analysis)")]
+        if (columns != []) and (not 'extensions' in columns): #written before the extension limit was part of the key
+            self.connection.execute("DROP TABLE analysis")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS analysis (hash INTEGER, quiescence INTEGER, extensions INTEGER, depth INTEGER, score INTEGER, "
+                                "pv TEXT, lastUsed INTEGER, PRIMARY KEY (hash, quiescence, extensions))")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS analysisLastUsed ON analysis (lastUsed)")
+        self.connection.commit()
+        self.clock = self.connection.execute("SELECT COALESCE(MAX(lastUsed), 0) FROM analysis").fetchone()[0]
+        self.count = len(self) #counted again before evicting, as other processes may have added entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    #SQLite integers are signed 64 bit
+    def __key(self, hash):
+        return hash - (1 << 64) if hash >= (1 << 63) else hash
+
+    def __tick(self):
+        self.clock = self.clock + 1
+        return self.clock
+
+    #Returns [depth, score, pv] of the position searched with the given limits or None;
+    #pv is a list of [xOrig, yOrig, xDest, yDest] moves, promotions with the index of the promotion piece appended
+    def get(self, hash, quiescenceLimit, extensionLimit):
+        key = self.__key(hash)
+        row = self.connection.execute("SELECT depth, score, pv FROM analysis WHERE hash = ? AND quiescence = ? AND extensions = ?",
+                                      (key, quiescenceLimit, extensionLimit)).fetchone()
+        if row == None:
+            self.misses = self.misses + 1
+            return None
+        self.hits = self.hits + 1
+        self.connection.execute("UPDATE analysis SET lastUsed = ? WHERE hash = ? AND quiescence = ? AND extensions = ?", (self.__tick(), key, quiescenceLimit, extensionLimit))
+        self.connection.commit()
+        pv = [[int(c) for c in move] for move in row[2].split()]
+        return [row[0], row[1], pv]
+
+    #Stores a search result, unless a deeper one of the position is stored already
+    def store(self, hash, quiescenceLimit, extensionLimit, depth, score, pv):
+        key = self.__key(hash)
+        row = self.connection.execute("SELECT depth FROM analysis WHERE hash = ? AND quiescence = ? AND extensions = ?",
+                                      (key, quiescenceLimit, extensionLimit)).fetchone()
+        if (row != None) and (row[0] > depth):
+            return
+        pvText = ' '.join([''.join([str(c) for c in move]) for move in pv])
+        self.connection.execute("INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?, ?)", (key, quiescenceLimit, extensionLimit, depth, score, pvText, self.__tick()))
+        if row == None:
+            self.count = self.count + 1
+            if self.count > self.maxEntries:
+                self.__evict()
+        self.connection.commit()
+
+    def __evict(self):
+        self.count = len(self)
+        if self.count <= self.maxEntries:
+            return
+        excess = self.count - self.maxEntries + int(self.evictionShare * self.maxEntries)
+        self.connection.execute("DELETE FROM analysis WHERE rowid IN (SELECT rowid FROM analysis ORDER BY lastUsed LIMIT ?)", (excess,))
+        self.count = self.count - excess
+        self.evictions = self.evictions + excess
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+
+    def clear(self):
+        self.connection.execute("DELETE FROM analysis")
+        self.connection.commit()
+        self.count = 0
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def getHitRate(self):
+        if self.hits + self.misses == 0:
+            return 0
+        return self.hits / (self.hits + self.misses)
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,569 @@
+# -*- coding: utf-8 -*-
+"""
+Board representation of the chess engine: move execution and reversal, check detection,
+and the incrementally updated hashes and evaluation scores
+"""
+
+import random, threading
+from .pieces import Colour, Pawn, Knight, Bishop, Rook, Queen, King
+from .evaluation import PieceSquareTables, loadDefaultParameters
+
+#Random keys for Zobrist hashing: a position's hash is the XOR of the keys of all pieces on their squares,
+#the en passant file, the castling rights and the side to move
+class Zobrist:
+
+    def __init__(self, seed = 20190721):
+        rng = random.Random(seed)
+        self.pieces = [] #indexed by [2*piece.index + piece.colour][8*x + y]
+        for i in range(12):
+            self.pieces.append([rng.getrandbits(64) for square in range(64)])
+        self.enPassant = [rng.getrandbits(64) for x in range(8)]
+        self.castling = [rng.getrandbits(64) for rights in range(16)]
+        self.blackToMove = rng.getrandbits(64)
+
+#Lookup tables, created by loadTables when the first board is set up, so that importing the engine stays cheap
+zobrist = None
+pieceSquareTables = None
+tablesLoaded = False #set once all tables are published
+tablesLock = threading.Lock()
+
+#Boards may be set up in several threads at once: the tables are built by one thread, and only published when complete
+def loadTables():
+    global zobrist, pieceSquareTables, tablesLoaded
+    if tablesLoaded:
+        return
+    with tablesLock:
+        if not tablesLoaded:
+            loadDefaultParameters()
+            newZobrist = Zobrist()
+            newPieceSquareTables = PieceSquareTables()
+            zobrist = newZobrist
+            pieceSquareTables = newPieceSquareTables
+            tablesLoaded = True
+
+def getZobrist():
+    loadTables()
+    return zobrist
+
+def getPieceSquareTables():
+    loadTables()
+    return pieceSquareTables
+
+#Location (x, y) of each square index of the 0x88 board (16*y + x)
+squareLocations = [(square & 7, square >> 4) for square in range(128)]
+
+#Castling rights kept by a move from or to each square (indexed 8*x + y): moves of a king or rook, and captures of a rook, lose the rights of these pieces
+castlingMasks = [15 & ~sum([castling[0] for castling in King.castlings if square in [8*4 + castling[1], 8*castling[3] + castling[1]]]) for square in range(64)]
+
+#Piece classes indexed by Piece.index
+pieceTypes = [Pawn, Knight, Bishop, Rook, Queen, King]
+
+#Returns the name of the square at x,y (e.g. "e2" for 4,1)
+def getSquareName(x, y):
+    return "abcdefgh"[x] + str(y + 1)
+
+#Moves are lists [xOrig, yOrig, xDest, yDest], with the index of the promotion piece appended for promotions.
+#Returns the name of the move in coordinate notation (e.g. "e2e4", "e7e8n")
+def getMoveName(move):
+    name = getSquareName(move[0], move[1]) + getSquareName(move[2], move[3])
+    if len(move) > 4:
+        name = name + pieceTypes[move[4]].symbol.lower()
+    return name
+
+#Returns the move given in coordinate notation, or None if the name is not a move
+#(a pawn move to the last rank without promotion letter is made as a queen promotion by ChessBoard.move)
+def parseMoveName(name):
+    if (not len(name) in [4, 5]) or (not name[0] in "abcdefgh") or (not name[2] in "abcdefgh") or (not name[1] in "12345678") or (not name[3] in "12345678"):
+        return None
+    move = ["abcdefgh".index(name[0]), int(name[1]) - 1, "abcdefgh".index(name[2]), int(name[3]) - 1]
+    if len(name) == 5:
+        if not name[4] in "nbrq":
+            return None
+        move.append("pnbrq".index(name[4]))
+    return move
+
+#The board state is kept per instance (in slots), so that boards do not share state:
+#squares: an 8x8 list containing Piece-instances (resp. inherited class instances)
+#cells: the same pieces on a flat 0x88 board of 128 entries, indexed 16*y + x (kept in sync with squares by __setSquare)
+#pieceSquares: piece lists, the 0x88 squares of the pieces as sets, indexed by 2*piece.index + piece.colour
+#kingWhiteLocation, kingBlackLocation: the kings' locations, kept for more efficient checks
+#enPassantPawn: the coordinate of a pawn allowing for an en passant capture ([-1,-1]: none)
+#castlingRights: 4-bit mask (white queenside, white kingside, black queenside, black kingside), see King.castlings
+#allowIllegalMoves: the engine is allowed to perform self-checking moves
+#hash, pawnHash, scoreMiddlegame, scoreEndgame, phase, halfmoveClock, hashHistory, plyOffset: position state, see resetPositionState
+class ChessBoard:
+
+    __slots__ = ['squares', 'cells', 'pieceSquares', 'kingWhiteLocation', 'kingBlackLocation', 'enPassantPawn', 'castlingRights', 'allowIllegalMoves',
+                 'hash', 'pawnHash', 'scoreMiddlegame', 'scoreEndgame', 'phase', 'halfmoveClock', 'hashHistory', 'plyOffset']
+    
+    def resetBoard(self):
+        self.squares = []
+        for x in range(8):
+            self.squares.append([])
+            for y in range(8):
+                self.squares[x].append([])
+                if y == 1:
+                    self.squares[x][y] = Pawn(Colour.White)
+                elif y == 6:
+                    self.squares[x][y] = Pawn(Colour.Black)
+                elif (y > 1) and (y < 6):
+                    self.squares[x][y] = None
+                elif (y == 0) or (y == 7):
+                    if y == 0:
+                        colour = Colour.White
+                    else:
+                        colour = Colour.Black
+                    if x == 0:
+                       self.squares[x][y] = Rook(colour)
+                    elif x == 1:
+                       self.squares[x][y] = Knight(colour)
+                    elif x == 2:
+                       self.squares[x][y] = Bishop(colour)
+                    elif x == 3:
+                       self.squares[x][y] = Queen(colour)
+                    elif x == 4:
+                       self.squares[x][y] = King(colour)
+                    elif x == 5:
+                       self.squares[x][y] = Bishop(colour)
+                    elif x == 6:
+                       self.squares[x][y] = Knight(colour)
+                    elif x == 7:
+                       self.squares[x][y] = Rook(colour)
+        self.kingWhiteLocation = [4,0] #Keep Track of the King's location for efficient Check-Checks
+        self.kingBlackLocation = [4,7]
+        self.castlingRights = 15
+        self.enPassantPawn = [-1,-1]
+        self.resetPositionState(Colour.White)
+                       
+    def _resetToDebugBoard(self):
+        self.resetBoard()
+        for x in range(8):
+            for y in range(8):
+                self.squares[x][y] = None
+        self.squares[0][0] = Rook(Colour.Black)
+        self.squares[1][1] = Pawn(Colour.Black)
+        self.squares[3][1] = Rook(Colour.White)
+        self.squares[3][5] = Pawn(Colour.Black)
+        self.squares[4][4] = Bishop(Colour.Black)
+        self.squares[4][4] = Bishop(Colour.Black)
+        self.squares[5][1] = Pawn(Colour.White)
+        self.squares[6][1] = King(Colour.White)
+        self.squares[6][7] = King(Colour.Black)
+        
+        self.kingWhiteLocation = [6,1]
+        self.kingBlackLocation = [6,7]
+        self.castlingRights = 0
+        self.resetPositionState(Colour.White)
+        
+    #Recomputes the incrementally updated state (hashes, evaluation, the 0x88 board) from scratch
+    #and restarts the position history (e.g. after setting up a board)
+    def resetPositionState(self, colour):
+        self.hash = 0
+        self.pawnHash = 0 #hash of the pawns only, keys the engine's pawn structure cache
+        self.scoreMiddlegame = 0
+        self.scoreEndgame = 0
+        self.phase = 0
+        self.cells = [None]*128
+        self.pieceSquares = [set() for i in range(12)]
+        for x in range(8):
+            for y in range(8):
+                self.cells[16*y + x] = self.squares[x][y]
+                if self.squares[x][y] != None:
+                    self.pieceSquares[2*self.squares[x][y].index + self.squares[x][y].colour].add(16*y + x)
+                    self.__placePiece(self.squares[x][y], x, y)
+        self.halfmoveClock = 0
+        self.hashHistory = [self.getHash(colour)]
+        self.plyOffset = colour #plies played before the start of the history (for the move number of getFEN)
+
+    #Sets the piece (or None) on square x, y of both board layouts: squares, indexed [x][y], and cells,
+    #a flat 0x88 board indexed 16*y + x, whose indices off the board have a bit of 0x88 set (used for move generation).
+    #Updates the piece lists, so that every change of a square (captures, promotions, castling, en passant) is reflected there
+    def __setSquare(self, x, y, piece):
+        square = 16*y + x
+        previous = self.cells[square]
+        if previous != None:
+            self.pieceSquares[2*previous.index + previous.colour].discard(square)
+        if piece != None:
+            self.pieceSquares[2*piece.index + piece.colour].add(square)
+        self.squares[x][y] = piece
+        self.cells[square] = piece
+
+    #Returns the locations (x, y) of the pieces of colour, by piece type. The list is a copy of the piece lists,
+    #i.e. moves may be made (and reverted) while iterating over it
+    def getPieceLocations(self, colour):
+        pieceSquares = self.pieceSquares
+        return [squareLocations[square] for i in range(colour, 12, 2) for square in pieceSquares[i]]
+
+    #The following methods update hashes, material and positional scores incrementally
+    #when a piece is placed on resp. removed from a square (the squares themselves are updated by the caller)
+    def __placePiece(self, piece, x, y):
+        i = 2*piece.index + piece.colour
+        self.hash = self.hash ^ zobrist.pieces[i][8*x + y]
+        if piece.index == Pawn.index:
+            self.pawnHash = self.pawnHash ^ zobrist.pieces[i][8*x + y]
+        self.scoreMiddlegame = self.scoreMiddlegame + pieceSquareTables.middlegame[i][8*x + y]
+        self.scoreEndgame = self.scoreEndgame + pieceSquareTables.endgame[i][8*x + y]
+        self.phase = self.phase + piece.phase
+
+    def __removePiece(self, piece, x, y):
+        i = 2*piece.index + piece.colour
+        self.hash = self.hash ^ zobrist.pieces[i][8*x + y]
+        if piece.index == Pawn.index:
+            self.pawnHash = self.pawnHash ^ zobrist.pieces[i][8*x + y]
+        self.scoreMiddlegame = self.scoreMiddlegame - pieceSquareTables.middlegame[i][8*x + y]
+        self.scoreEndgame = self.scoreEndgame - pieceSquareTables.endgame[i][8*x + y]
+        self.phase = self.phase - piece.phase
+
+    def __movePiece(self, piece, xOrig, yOrig, xDest, yDest):
+        self.__removePiece(piece, xOrig, yOrig)
+        self.__placePiece(piece, xDest, yDest)
+
+    #Castling rights as 4-bit mask (white queenside, white kingside, black queenside, black kingside)
+    def getCastlingRights(self):
+        return self.castlingRights
+
+    #Sets up the position given in Forsyth-Edwards Notation and returns the colour to move.
+    #Castling rights are only kept if king and rook stand on their initial squares; raises ValueError for invalid strings
+    def setFEN(self, fen):
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("Invalid FEN (expected at least 4 fields): " + fen)
+        pieceTypes = {'p': Pawn, 'n': Knight, 'b': Bishop, 'r': Rook, 'q': Queen, 'k': King}
+        squares = [[None]*8 for x in range(8)]
+        kingLocations = [[], []]
+        rows = fields[0].split('/')
+        if len(rows) != 8:
+            raise ValueError("Invalid FEN (expected 8 ranks): " + fen)
+        for i in range(8):
+            y = 7 - i
+            x = 0
+            for c in rows[i]:
+                if c.isdigit():
+                    x = x + int(c)
+                elif (c.lower() in pieceTypes) and (x < 8):
+                    colour = Colour.White if c.isupper() else Colour.Black
+                    squares[x][y] = pieceTypes[c.lower()](colour)
+                    if c.lower() == 'k':
+                        kingLocations[colour].append([x, y])
+                    x = x + 1
+                else:
+                    raise ValueError("Invalid FEN (rank " + str(y + 1) + "): " + fen)
+            if x != 8:
+                raise ValueError("Invalid FEN (rank " + str(y + 1) + "): " + fen)
+        if (len(kingLocations[Colour.White]) != 1) or (len(kingLocations[Colour.Black]) != 1):
+            raise ValueError("Invalid FEN (expected one king per side): " + fen)
+        if not fields[1] in ['w', 'b']:
+            raise ValueError("Invalid FEN (side to move): " + fen)
+        colour = Colour.White if fields[1] == 'w' else Colour.Black
+        castlingRights = 0
+        for c in fields[2].replace('-', ''):
+            if not c in "KQkq":
+                raise ValueError("Invalid FEN (castling rights): " + fen)
+            right, y, xKing, xRook = King.castlings["KQkq".index(c)][:4]
+            king = squares[4][y]
+            rook = squares[xRook][y]
+            if isinstance(king, King) and isinstance(rook, Rook) and (king.colour == rook.colour == (Colour.White if y == 0 else Colour.Black)):
+                castlingRights = castlingRights | right
+        enPassantPawn = [-1,-1]
+        if fields[3] != '-':
+            if (len(fields[3]) != 2) or (not fields[3][0] in "abcdefgh") or (not fields[3][1] in "36"):
+                raise ValueError("Invalid FEN (en passant square): " + fen)
+            x = "abcdefgh".index(fields[3][0])
+            y = 3 if fields[3][1] == '3' else 4 #the pawn stands in front of the square it skipped
+            if isinstance(squares[x][y], Pawn):
+                enPassantPawn = [x, y]
+        try:
+            halfmoveClock = int(fields[4]) if len(fields) > 4 else 0
+            fullmoveNumber = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError("Invalid FEN (move counters): " + fen)
+        self.squares = squares
+        self.kingWhiteLocation = kingLocations[Colour.White][0]
+        self.kingBlackLocation = kingLocations[Colour.Black][0]
+        self.enPassantPawn = enPassantPawn
+        self.castlingRights = castlingRights
+        self.resetPositionState(colour)
+        self.halfmoveClock = halfmoveClock
+        self.plyOffset = 2*(max(fullmoveNumber, 1) - 1) + colour
+        return colour
+
+    #Returns the position with colour to move in Forsyth-Edwards Notation
+    def getFEN(self, colour):
+        rows = []
+        for y in range(7, -1, -1):
+            row = ''
+            empty = 0
+            for x in range(8):
+                piece = self.squares[x][y]
+                if piece == None:
+                    empty = empty + 1
+                    continue
+                if empty > 0:
+                    row = row + str(empty)
+                    empty = 0
+                row = row + (piece.symbol.upper() if piece.colour == Colour.White else piece.symbol.lower())
+            if empty > 0:
+                row = row + str(empty)
+            rows.append(row)
+        rights = self.getCastlingRights()
+        castling = ''
+        for bit, c in [[2, 'K'], [1, 'Q'], [8, 'k'], [4, 'q']]:
+            if rights & bit:
+                castling = castling + c
+        enPassant = '-'
+        if self.enPassantPawn[0] != -1:
+            enPassant = getSquareName(self.enPassantPawn[0], 2 if self.enPassantPawn[1] == 3 else 5)
+        ply = self.plyOffset + len(self.hashHistory) - 1
+        return ('/'.join(rows) + ' ' + ('w' if colour == Colour.White else 'b') + ' ' + (castling if castling != '' else '-') + ' ' +
+                enPassant + ' ' + str(self.halfmoveClock) + ' ' + str(ply // 2 + 1))
+
+    #Returns the Zobrist hash of the position with colour to move
+    def getHash(self, colour):
+        h = self.hash ^ zobrist.castling[self.castlingRights]
+        if self.enPassantPawn[0] != -1:
+            h = h ^ zobrist.enPassant[self.enPassantPawn[0]]
+        if colour == Colour.Black:
+            h = h ^ zobrist.blackToMove
+        return h
+
+    #Updates halfmove clock and position history after the given move was executed
+    def __recordMove(self, move):
+        if isinstance(move.pieceMoved, Pawn) or (move.pieceTaken != None):
+            self.halfmoveClock = 0
+        else:
+            self.halfmoveClock = self.halfmoveClock + 1
+        self.hashHistory.append(self.getHash(not move.pieceMoved.colour))
+
+    #Returns the number of earlier occurrences of the current position.
+    #Positions can only repeat every second ply, and not across captures or pawn moves.
+    def countRepetitions(self):
+        count = 0
+        i = len(self.hashHistory) - 3
+        while i >= max(len(self.hashHistory) - 1 - self.halfmoveClock, 0):
+            if self.hashHistory[i] == self.hashHistory[-1]:
+                count = count + 1
+            i = i - 2
+        return count
+
+    def isThreefoldRepetition(self):
+        return self.countRepetitions() >= 2
+
+    #The fifty-move rule applies after 100 halfmoves without capture or pawn move, unless the last of them checkmated colour (to move)
+    def isFiftyMoveRule(self, colour):
+        return (self.halfmoveClock >= 100) and not self.isCheckmate(colour)
+
+    #Returns True if colour is in check and has no legal move (also during a search, which allows illegal moves)
+    def isCheckmate(self, colour):
+        if not self.isKingAttacked(colour):
+            return False
+        allowIllegalMoves = self.allowIllegalMoves
+        self.allowIllegalMoves = False
+        checkmate = self.generateMoveList(colour) == []
+        self.allowIllegalMoves = allowIllegalMoves
+        return checkmate
+
+    #Used by the search: returns true if the position with colour to move is a draw by the fifty-move rule or by repetition.
+    #A single repetition of a position within the search path (i.e. from ply searchStart of the history on) suffices.
+    def isDrawByRule(self, searchStart, colour):
+        if self.halfmoveClock >= 100:
+            return not self.isCheckmate(colour)
+        count = 0
+        i = len(self.hashHistory) - 3
+        while i >= max(len(self.hashHistory) - 1 - self.halfmoveClock, 0):
+            if self.hashHistory[i] == self.hashHistory[-1]:
+                if i >= searchStart:
+                    return True
+                count = count + 1
+                if count == 2:
+                    return True
+            i = i - 2
+        return False
+
+    #Returns True if colour is in check
+    def isColourCheck(self, colour):
+        return self.isKingAttacked(colour)
+
+    #Returns True if the king of colour is attacked
+    def isKingAttacked(self, colour):
+        xKing, yKing = self.kingWhiteLocation if colour == Colour.White else self.kingBlackLocation
+        return self.isAttackedBy(xKing, yKing, not colour)
+    
+    #Get all moves of colour
+    def generateMoveList(self, colour):
+        moves = []
+        for x, y in self.getPieceLocations(colour):
+            self.squares[x][y].getMoveList(x, y, self)
+            for mov in self.squares[x][y].moves:
+                mov_ =self.move(x,y, *mov)
+                if mov_.validMove == True:
+                    moves.append([x,y] + mov)
+                    self.revertMove(mov_)
+        return moves
+    
+    #Undo the given move, assuming that the current board state resulted from the passed argument move
+    def revertMove(self, move):
+        self.__restoreSquares(move)
+        self.enPassantPawn = move.prevEnPassantPawn
+        self.castlingRights = move.prevCastlingRights
+        self.hash = move.prevHash
+        self.pawnHash = move.prevPawnHash
+        self.scoreMiddlegame = move.prevScoreMiddlegame
+        self.scoreEndgame = move.prevScoreEndgame
+        self.phase = move.prevPhase
+        self.halfmoveClock = move.prevHalfmoveClock
+        self.hashHistory.pop()
+
+    #Puts the pieces changed by move back on their squares (the pawn of a promotion, the captured piece,
+    #the rook of a castling) and restores the king location
+    def __restoreSquares(self, move):
+        xOrig, yOrig = move.orig
+        xDest, yDest = move.dest
+        self.__setSquare(xOrig, yOrig, move.pieceMoved)
+        if move.isEnPassant:
+            self.__setSquare(xDest, yDest, None)
+            self.__setSquare(xDest, yOrig, move.pieceTaken)
+        else:
+            self.__setSquare(xDest, yDest, move.pieceTaken)
+        if move.castling != None:
+            right, y, xKing, xRook, xRookDest = move.castling[:5]
+            self.__setSquare(xRook, y, self.squares[xRookDest][y])
+            self.__setSquare(xRookDest, y, None)
+        if isinstance(move.pieceMoved, King):
+            if move.pieceMoved.colour == Colour.White:
+                self.kingWhiteLocation = [xOrig, yOrig]
+            else:
+                self.kingBlackLocation = [xOrig, yOrig]
+
+    #Returns true if x,y is attacked by any piece of the specified colour. Looks for attackers from the square
+    #(along the lines, and on the knight, pawn and king squares around it) instead of generating the attackers' captures
+    def isAttackedBy(self, xOrig, yOrig, colour):
+        cells = self.cells
+        origin = 16*yOrig + xOrig
+        for offset in Knight.offsets:
+            square = origin + offset
+            if (not square & 0x88) and isinstance(cells[square], Knight) and (cells[square].colour == colour):
+                return True
+        forward = 16 if colour == Colour.Black else -16 #direction towards the pawns of colour attacking the square
+        for offset in Queen.offsets:
+            square = origin + offset
+            while (not square & 0x88) and (cells[square] == None):
+                square = square + offset
+            if square & 0x88:
+                continue
+            piece = cells[square]
+            if piece.colour != colour:
+                continue
+            if isinstance(piece, Queen) or (isinstance(piece, Rook) and (offset in Rook.offsets)) or (isinstance(piece, Bishop) and (offset in Bishop.offsets)):
+                return True
+            if square == origin + offset: #adjacent pieces: kings, and pawns attacking diagonally
+                if isinstance(piece, King) or (isinstance(piece, Pawn) and (offset in [forward - 1, forward + 1])):
+                    return True
+        return False
+    
+    #Returns the move-class and performs the move if it is legal (and execute=True).
+    #Pawns reaching the last rank are promoted to the piece with the index promotion
+    def move(self, xOrig, yOrig, xDest, yDest, promotion = Queen.index):
+        move = MoveData()
+        move.orig = [xOrig, yOrig]
+        move.dest = [xDest, yDest]
+        move.pieceMoved = piece = self.squares[xOrig][yOrig]
+        move.pieceTaken = self.squares[xDest][yDest]
+        move.prevEnPassantPawn = self.enPassantPawn
+        move.prevCastlingRights = self.castlingRights
+        move.prevHash = self.hash
+        move.prevPawnHash = self.pawnHash
+        move.prevScoreMiddlegame = self.scoreMiddlegame
+        move.prevScoreEndgame = self.scoreEndgame
+        move.prevPhase = self.phase
+        move.prevHalfmoveClock = self.halfmoveClock
+        
+        if piece == None:
+            return move
+        if isinstance(piece, Pawn) and ((yDest == 7) or (yDest == 0)):
+            move.promotion = promotion
+        if (not self.allowIllegalMoves):
+            if not ([xDest, yDest] if move.promotion == None else [xDest, yDest, promotion]) in piece.getMoveList(xOrig, yOrig, self):
+                return move 
+        colour = piece.colour
+        if isinstance(piece, King):
+            if abs(xDest - xOrig) == 2: #castling: requires the right, and that the king neither leaves, passes nor enters an attacked square
+                for castling in King.castlings:
+                    if (castling[1] == yOrig == yDest) and (castling[2] == xDest):
+                        break
+                else:
+                    return move
+                if not self.castlingRights & castling[0]:
+                    return move
+                for x in castling[6]:
+                    if self.isAttackedBy(x, yDest, not colour):
+                        return move
+                move.castling = castling
+                self.__setSquare(castling[4], yDest, self.squares[castling[3]][yDest])
+                self.__setSquare(castling[3], yDest, None)
+            if colour == Colour.White:
+                self.kingWhiteLocation = [xDest, yDest]
+            else:
+                self.kingBlackLocation = [xDest, yDest]
+        elif isinstance(piece, Pawn) and (xDest != xOrig) and (move.pieceTaken == None): #en passant: the captured pawn stands beside the origin
+            move.isEnPassant = True
+            move.pieceTaken = self.squares[xDest][yOrig]
+            self.__setSquare(xDest, yOrig, None)
+        
+        #update board
+        self.__setSquare(xDest, yDest, piece)
+        self.__setSquare(xOrig, yOrig, None)
+        
+        #check whether player checks himself (i.e. invalid move)
+        if (not self.allowIllegalMoves) and self.isKingAttacked(colour):
+            self.__restoreSquares(move)
+            return move
+        
+        #update hash and evaluation
+        self.__movePiece(piece, xOrig, yOrig, xDest, yDest)
+        if move.pieceTaken != None:
+            self.__removePiece(move.pieceTaken, xDest, yOrig if move.isEnPassant else yDest)
+        if move.castling != None:
+            self.__movePiece(self.squares[move.castling[4]][yDest], move.castling[3], yDest, move.castling[4], yDest)
+        
+        self.enPassantPawn = [-1,-1]
+        if move.promotion != None:
+            self.__setSquare(xDest, yDest, pieceTypes[promotion](colour))
+            self.__removePiece(piece, xDest, yDest)
+            self.__placePiece(self.squares[xDest][yDest], xDest, yDest)
+        elif isinstance(piece, Pawn) and (abs(yDest-yOrig) == 2): #Allow for en passant capture in the next turn
+            self.enPassantPawn = [xDest,yDest]
+        self.castlingRights = self.castlingRights & castlingMasks[8*xOrig + yOrig] & castlingMasks[8*xDest + yDest]
+
+        move.validMove = True
+        self.__recordMove(move)
+        return move        
+        
+    def __init__(self):
+        loadTables()
+        self.allowIllegalMoves = False
+        self.resetBoard()
+
+
+class MoveData:
+
+    __slots__ = ['orig', 'dest', 'pieceMoved', 'pieceTaken', 'castling', 'promotion', 'validMove', 'prevEnPassantPawn', 'prevCastlingRights', 'isEnPassant',
+                 'prevHash', 'prevPawnHash', 'prevScoreMiddlegame', 'prevScoreEndgame', 'prevPhase', 'prevHalfmoveClock']
+
+    def __init__(self):
+        self.orig = [-1,-1]
+        self.dest = [-1,-1]
+        self.pieceMoved = None
+        self.pieceTaken = None
+        self.castling = None #entry of King.castlings, if the move is a castling
+        self.promotion = None #index of the piece a pawn is promoted to
+        self.validMove = False
+        self.prevEnPassantPawn = [-1,-1]#to remember whether an en passant was possible
+        self.prevCastlingRights = 0
+        self.isEnPassant = False
+        self.prevHash = 0 #piece placement hashes, evaluation state and halfmove clock before the move
+        self.prevPawnHash = 0
+        self.prevScoreMiddlegame = 0
+        self.prevScoreEndgame = 0
+        self.prevPhase = 0
+        self.prevHalfmoveClock = 0
+    
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Configuration of the chess engine: search and evaluation settings, and the memory budget of its hash tables
+"""
+
+from .evaluation import PawnHashTable, EvaluationCache
+from .transposition import TranspositionTable
+
+#Settings of an Engine, applied when the engine is created (e.g. Engine(config = EngineConfig(hashSize = 64, quiescenceLimit = 3))).
+#The hash tables share the memory budget hashSize: the pawn hash table and the evaluation cache get their configured numbers of entries,
+#the transposition table the largest power of 2 of entries that fits into the rest of the budget.
+#Memory is estimated from the bytes per entry of each table (including the Python objects of keys and values), so that hashSize is an
+#estimate of the memory used rather than a hard limit
+class EngineConfig:
+
+    #Memory budget of the hash tables in MB
+    hashSize = 4
+
+    #Number of entries of the pawn hash table
+    pawnTableSize = 16384
+    #Number of entries of the evaluation cache and its eviction policy ('replace' or 'lru', see EvaluationCache).
+    #Disabled (0) by default, as the incrementally updated evaluation is about as cheap as a cache lookup
+    evalCacheSize = 0
+    evalCachePolicy = 'replace'
+
+    #The maximum depth for quiescence searches after the normal (=all moves) depth is reached
+    quiescenceLimit = 2
+    #Search extensions: moves that give check and recaptures (captures of a piece of the same value on the square of the
+    #previous move's capture) are searched one ply deeper, at most extensionLimit times per line so that the search tree remains bounded
+    extensionLimit = 1
+
+    #If true, pseudorandom variations between -rand_limit and rand_limit will be applied by the evaluation function
+    randomness = True
+    rand_limit = 30
+    #'random': variations are drawn from the engine's own random number generator (reproducible if a seed is given)
+    #'hash': variations are derived from the position hash and the seed, i.e. the same position always gets the same variation
+    randomMode = 'random'
+
+    #Settings are given by name; unknown names and invalid values raise a ValueError, as do budgets too small for the tables
+    def __init__(self, **settings):
+        for name in settings:
+            if name.startswith('_') or (not hasattr(EngineConfig, name)) or callable(getattr(EngineConfig, name)):
+                raise ValueError("Unknown engine setting: " + name)
+            setattr(self, name, settings[name])
+        for name in ['quiescenceLimit', 'extensionLimit', 'rand_limit']:
+            value = getattr(self, name)
+            if isinstance(value, bool) or (not isinstance(value, int)) or (value < 0):
+                raise ValueError("'" + name + "' must be a non-negative integer")
+        if not self.randomMode in ['random', 'hash']:
+            raise ValueError("Unknown random mode: " + str(self.randomMode))
+        self.getTableSizes()
+
+    #Returns the numbers of entries [transposition table, pawn hash table, evaluation cache] within the memory budget
+    def getTableSizes(self):
+        if isinstance(self.hashSize, bool) or (not isinstance(self.hashSize, (int, float))) or (not 0 < self.hashSize < float('inf')):
+            raise ValueError("Hash size must be a positive number of MB: " + str(self.hashSize))
+        if isinstance(self.pawnTableSize, bool) or (not isinstance(self.pawnTableSize, int)) or (self.pawnTableSize < 1):
+            raise ValueError("The pawn hash table needs at least one entry")
+        if isinstance(self.evalCacheSize, bool) or (not isinstance(self.evalCacheSize, int)):
+            raise ValueError("Evaluation cache size must be an integer: " + str(self.evalCacheSize))
+        if not self.evalCachePolicy in EvaluationCache.entryBytes:
+            raise ValueError("Unknown eviction policy: " + str(self.evalCachePolicy))
+        evalCacheSize = max(self.evalCacheSize, 0)
+        remaining = int(self.hashSize * 2**20) - self.pawnTableSize * PawnHashTable.entryBytes - evalCacheSize * EvaluationCache.entryBytes[self.evalCachePolicy]
+        entries = remaining // TranspositionTable.entryBytes
+        if entries < 1:
+            raise ValueError("Hash size of " + str(self.hashSize) + " MB is too small for the pawn hash table and evaluation cache")
+        return [1 << (entries.bit_length() - 1), self.pawnTableSize, evalCacheSize]
+
+    #Returns the estimated memory (bytes) of the hash tables of an engine with this configuration
+    def getMemoryFootprint(self):
+        transpositionTableSize, pawnTableSize, evalCacheSize = self.getTableSizes()
+        return (transpositionTableSize * TranspositionTable.entryBytes + pawnTableSize * PawnHashTable.entryBytes +
+                evalCacheSize * EvaluationCache.entryBytes[self.evalCachePolicy])
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Evaluation tables and caches of the chess engine
+- The integers used to evaluate positional strength of each piece type come from
+   https://www.chessprogramming.org/Simplified_Evaluation_Function
+- They can be replaced by tuned ones from a parameter file (see chessengine.tuner), which is read when the tables are built
+"""
+
+import collections
+from .pieces import Colour, Pawn, Knight, Bishop, Rook, Queen, King
+
+#Parameter file applied when the tables are built (i.e. when the first board is set up), if it exists
+#(None: parameters.json in the package directory, see getParameterPath).
+#The modules for reading it are imported on demand, so that importing the engine stays cheap
+parameterPath = None
+
+def getParameterPath():
+    import os
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'parameters.json') if parameterPath == None else parameterPath
+
+#Sets the piece values and scoreboards from a parameter file: a JSON object with an entry per piece type name (e.g. "Knight"),
+#holding its "value" and 8x8 "scoreBoard" and "scoreBoardEndgame" (rows from the 8th to the 1st rank, as in the piece classes).
+#Missing entries keep their values. Raises ValueError if the file is malformed.
+#Tables that are already built are not changed, so that the parameters must be loaded before the first board is set up
+def loadParameters(path):
+    import json
+    with open(path) as file:
+        try:
+            parameters = json.load(file)
+        except ValueError as e:
+            raise ValueError("Invalid parameter file " + path + ": " + str(e))
+    if not isinstance(parameters, dict):
+        raise ValueError("Invalid parameter file " + path + ": expected an object of piece types")
+    for pieceType in [Pawn, Knight, Bishop, Rook, Queen, King]:
+        entry = parameters.get(pieceType.__name__, {})
+        for name in ['scoreBoard', 'scoreBoardEndgame']:
+            if (name in entry) and ((not isinstance(entry[name], list)) or (len(entry[name]) != 8) or
+                                    (not all([isinstance(row, list) and (len(row) == 8) and all([isinstance(v, int) for v in row]) for row in entry[name]]))):
+                raise ValueError("Invalid parameter file " + path + ": " + pieceType.__name__ + " " + name + " must be 8x8 integers")
+        if ('value' in entry) and (not isinstance(entry['value'], int)):
+            raise ValueError("Invalid parameter file " + path + ": " + pieceType.__name__ + " value must be an integer")
+        for name in ['value', 'scoreBoard', 'scoreBoardEndgame']:
+            if name in entry:
+                setattr(pieceType, name, entry[name])
+
+#Writes the piece values and scoreboards of all piece types to a parameter file (see loadParameters), one row of a scoreboard per line
+def saveParameters(path):
+    import json
+    entries = []
+    for pieceType in [Pawn, Knight, Bishop, Rook, Queen, King]:
+        tables = []
+        for name in ['scoreBoard', 'scoreBoardEndgame']:
+            rows = [json.dumps([int(v) for v in row]) for row in getattr(pieceType, name)]
+            tables.append('    "' + name + '": [\n      ' + ',\n      '.join(rows) + ']')
+        entries.append('  "' + pieceType.__name__ + '": {\n    "value": ' + str(int(pieceType.value)) + ',\n' + ',\n'.join(tables) + '}')
+    with open(path, 'w') as file:
+        file.write('{\n' + ',\n'.join(entries) + '\n}\n')
+
+#Applies the parameter file at getParameterPath(), if it exists
+def loadDefaultParameters():
+    import os
+    path = getParameterPath()
+    if os.path.exists(path):
+        loadParameters(path)
+
+#Material plus positional value of each piece type and colour on each square, for middlegame and endgame.
+#Indexed by [2*piece.index + piece.colour][8*x + y], white pieces valued positively and black pieces negatively.
+#The board keeps the sums over its pieces updated incrementally, the engine interpolates them by game phase.
+class PieceSquareTables:
+
+    maxPhase = 24
+
+    def __init__(self):
+        self.middlegame = [None]*12
+        self.endgame = [None]*12
+        for pieceType in [Pawn, Knight, Bishop, Rook, Queen, King]:
+            for colour in [Colour.White, Colour.Black]:
+                self.middlegame[2*pieceType.index + colour] = self.__getTable(pieceType.value, pieceType.scoreBoard, colour)
+                self.endgame[2*pieceType.index + colour] = self.__getTable(pieceType.value, pieceType.scoreBoardEndgame, colour)
+
+    def __getTable(self, value, scoreBoard, colour):
+        table = [0]*64
+        for x in range(8):
+            for y in range(8):
+                if colour == Colour.White:
+                    table[8*x + y] = value + scoreBoard[7-y][x]
+                else:
+                    table[8*x + y] = -value - scoreBoard[y][x]
+        return table
+
+
+#Caches the pawn structure evaluation per pawn configuration, keyed by the board's pawn-only hash.
+#The table has a fixed number of slots indexed by the key; a new entry replaces the old one in its slot.
+class PawnHashTable:
+
+    #Estimated memory per entry in bytes when the table is full (slots, key and value objects; measured about 153 bytes)
+    entryBytes = 155
+
+    def __init__(self, size):
+        self.size = size
+        self.keys = [None]*size
+        self.values = [None]*size
+        self.probes = 0
+        self.hits = 0
+
+    def get(self, key):
+        self.probes = self.probes + 1
+        if self.keys[key % self.size] == key:
+            self.hits = self.hits + 1
+            return self.values[key % self.size]
+        return None
+
+    def store(self, key, value):
+        self.keys[key % self.size] = key
+        self.values[key % self.size] = value
+
+    def resetStats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def getHitRate(self):
+        if self.probes == 0:
+            return 0
+        return self.hits / self.probes
+
+    #Returns the estimated memory of the table in bytes
+    def getMemoryUsage(self):
+        return self.size * self.entryBytes
+
+#Bounded cache of position evaluations keyed by the position hash, with one of two eviction policies:
+#'replace': fixed slots indexed by the key, a new entry evicts the one in its slot (cheapest lookups)
+#'lru': if the cache is full, the least recently used entry is evicted (best hit rate for small sizes)
+class EvaluationCache:
+
+    #Estimated memory per entry in bytes when the cache is full, per policy, measured with tracemalloc (including key and value objects).
+    #The 'lru' dictionary keeps links between the entries, and its hash table grows in steps, so that it takes 185 to 265 bytes per entry
+    #depending on the size (briefly about 300 while the table grows); the estimate is the upper end
+    entryBytes = {'replace': 80, 'lru': 270}
+
+    def __init__(self, size, policy = 'replace'):
+        self.size = size
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if policy == 'lru':
+            self.get = self.__getLRU
+            self.store = self.__storeLRU
+        elif policy != 'replace':
+            raise ValueError("Unknown eviction policy: " + str(policy))
+        self.clear()
+
+    def get(self, key):
+        if (self.size > 0) and (self.keys[key % self.size] == key):
+            self.hits = self.hits + 1
+            return self.values[key % self.size]
+        self.misses = self.misses + 1
+        return None
+
+    def store(self, key, value):
+        if self.size <= 0:
+            return
+        if self.keys[key % self.size] != None:
+            self.evictions = self.evictions + 1
+        self.keys[key % self.size] = key
+        self.values[key % self.size] = value
+
+    def __getLRU(self, key):
+        value = self.entries.get(key)
+        if value == None:
+            self.misses = self.misses + 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits = self.hits + 1
+        return value
+
+    def __storeLRU(self, key, value):
+        if self.size <= 0:
+            return
+        self.entries[key] = value
+        if len(self.entries) > self.size:
+            self.entries.popitem(last = False)
+            self.evictions = self.evictions + 1
+
+    def clear(self):
+        if self.policy == 'lru':
+            self.entries = collections.OrderedDict()
+        else:
+            self.keys = [None]*max(self.size, 0)
+            self.values = [None]*max(self.size, 0)
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def getHitRate(self):
+        if self.hits + self.misses == 0:
+            return 0
+        return self.hits / (self.hits + self.misses)
+
+    #Returns the estimated memory of the cache in bytes
+    def getMemoryUsage(self):
+        return max(self.size, 0) * self.entryBytes[self.policy]
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Game records in PGN (Portable Game Notation) of the chess engine
+- PGNWriter appends games to a PGN file as they are played, with optional comments per move (e.g. the engine's search results)
+- readPGN reads games one at a time and replays them through ChessBoard.move, so that files of any size can be read
+- Run with: python -m chessengine.pgn games.pgn (replays all games of the file and reports their number and speed)
+"""
+
+import time, datetime, re, sys
+from .pieces import Colour, Pawn, Knight, Bishop, Rook, Queen, King
+from .board import ChessBoard, pieceTypes, getSquareName, getMoveName
+
+startFEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+results = ["1-0", "0-1", "1/2-1/2", "*"]
+
+#Piece classes by their letter in standard algebraic notation (pawns have none)
+sanPieceTypes = {'N': Knight, 'B': Bishop, 'R': Rook, 'Q': Queen, 'K': King}
+
+#Returns the squares [x, y] of the pieces of pieceType and colour that can legally move to xDest, yDest
+def getLegalOrigins(board, pieceType, colour, xDest, yDest, promotion = Queen.index):
+    origins = []
+    for square in list(board.pieceSquares[2*pieceType.index + colour]):
+        x, y = square & 7, square >> 4
+        move = board.move(x, y, xDest, yDest, promotion)
+        if move.validMove:
+            board.revertMove(move)
+            origins.append([x, y])
+    return origins
+
+#Returns the name of the legal move [xOrig, yOrig, xDest, yDest(, promotion)] of colour in standard algebraic notation
+#(e.g. "Nf3", "exd5", "Rae1", "O-O", "e8=N+"); raises ValueError if the move is illegal
+def getSANName(board, move, colour):
+    xOrig, yOrig, xDest, yDest = move[:4]
+    piece = board.squares[xOrig][yOrig]
+    if (piece == None) or (piece.colour != colour):
+        raise ValueError("Illegal move: " + getMoveName(move))
+    capture = (board.squares[xDest][yDest] != None) or (isinstance(piece, Pawn) and (xDest != xOrig))
+    if isinstance(piece, King) and (abs(xDest - xOrig) == 2):
+        name = "O-O" if xDest > xOrig else "O-O-O"
+    elif isinstance(piece, Pawn):
+        name = ("abcdefgh"[xOrig] + "x" if capture else "") + getSquareName(xDest, yDest)
+        if len(move) > 4:
+            name = name + "=" + pieceTypes[move[4]].symbol.upper()
+    else:
+        name = piece.symbol
+        others = [origin for origin in getLegalOrigins(board, type(piece), colour, xDest, yDest) if origin != [xOrig, yOrig]]
+        if others != []: #disambiguate by the file if it is unique, else by the rank if it is unique, else by both
+            if not xOrig in [origin[0] for origin in others]:
+                name = name + "abcdefgh"[xOrig]
+            elif not yOrig in [origin[1] for origin in others]:
+                name = name + str(yOrig + 1)
+            else:
+                name = name + getSquareName(xOrig, yOrig)
+        name = name + ("x" if capture else "") + getSquareName(xDest, yDest)
+    made = board.move(*move)
+    if not made.validMove:
+        raise ValueError("Illegal move: " + getMoveName(move))
+    if board.isColourCheck(not colour):
+        name = name + ("#" if board.generateMoveList(not colour) == [] else "+")
+    board.revertMove(made)
+    return name
+
+#Makes the legal move of colour named in standard algebraic notation on the board; returns [move, MoveData]
+#(move as [xOrig, yOrig, xDest, yDest(, promotion)]), or None if the name is no legal move and the board is unchanged.
+#Check and annotation marks are ignored; castling may also be written with zeros, promotions without "="
+def makeSANMove(board, name, colour):
+    name = name.rstrip("+#!?")
+    promotion = Queen.index
+    if name in ["O-O", "0-0", "O-O-O", "0-0-0"]:
+        pieceType = King
+        y = 0 if colour == Colour.White else 7
+        origins = [[4, y]]
+        xDest, yDest = 6 if len(name) == 3 else 2, y
+    else:
+        if (len(name) > 2) and (name[0] in "abcdefgh") and (name[-1] in "NBRQ"):
+            promotion = sanPieceTypes[name[-1]].index
+            name = name[:-2] if name[-2] == "=" else name[:-1]
+        pieceType = sanPieceTypes.get(name[:1], Pawn)
+        body = (name if pieceType == Pawn else name[1:]).replace("x", "").replace(":", "")
+        if (len(body) < 2) or (len(body) > 4) or (not body[-2] in "abcdefgh") or (not body[-1] in "12345678"):
+            return None
+        xDest, yDest = "abcdefgh".index(body[-2]), int(body[-1]) - 1
+        hint = body[:-2] #file and/or rank of the origin
+        if pieceType == Pawn: #the origin follows from the destination, and the file of a capture
+            y = yDest - (1 if colour == Colour.White else -1)
+            if (not 0 < y < 7) or ((hint != "") and (not hint[0] in "abcdefgh")):
+                return None
+            if hint != "":
+                origins = [["abcdefgh".index(hint[0]), y]]
+            elif (board.squares[xDest][y] == None) and (yDest == (3 if colour == Colour.White else 4)): #double step
+                origins = [[xDest, 2*y - yDest]]
+            else:
+                origins = [[xDest, y]]
+        else:
+            origins = [[square & 7, square >> 4] for square in board.pieceSquares[2*pieceType.index + colour]]
+            for c in hint:
+                if c in "abcdefgh":
+                    origins = [origin for origin in origins if origin[0] == "abcdefgh".index(c)]
+                elif c in "12345678":
+                    origins = [origin for origin in origins if origin[1] == int(c) - 1]
+                else:
+                    return None
+    #a correctly disambiguated name leaves one legal move among the origins
+    for xOrig, yOrig in origins:
+        piece = board.squares[xOrig][yOrig]
+        if (piece == None) or (piece.colour != colour) or (type(piece) != pieceType):
+            continue
+        made = board.move(xOrig, yOrig, xDest, yDest, promotion)
+        if made.validMove:
+            return [[xOrig, yOrig, xDest, yDest] + ([promotion] if made.promotion != None else []), made]
+    return None
+
+#Returns the legal move of colour named in standard algebraic notation, or None if the name is no legal move (see makeSANMove)
+def parseSANName(board, name, colour):
+    result = makeSANMove(board, name, colour)
+    if result == None:
+        return None
+    board.revertMove(result[1])
+    return result[0]
+
+#Returns the comment of an engine move: the depth and valuation (white positive, in pawns) of the search, its nodes and time (seconds)
+def getSearchComment(depth, score, nodes, seconds):
+    return "depth " + str(depth) + ", score " + ("%+.2f"%(score / 100) if score != None else "-") + ", nodes " + str(nodes) + ", time " + "%.2f"%seconds + "s"
+
+#Appends games to a PGN file. A game is started with startGame, its moves are added before they are made on the board,
+#and endGame writes the game (tag pairs, then the movetext) and flushes the file, so that finished games are kept if the process stops.
+#Only the game in progress is held in memory
+class PGNWriter:
+
+    lineLength = 79 #maximum length of the movetext lines
+
+    def __init__(self, path, event = "Engine games", site = "?"):
+        self.path = path
+        self.file = open(path, 'a')
+        self.event = event
+        self.site = site
+        self.round = 0
+        self.tags = None #tag pairs of the game in progress, None if no game is recorded
+        self.moveText = []
+        self.ply = 0
+
+    def isRecording(self):
+        return self.tags != None
+
+    #Starts a game from the position on the board with colour to move; further tag pairs may be given as dict
+    def startGame(self, board, colour, white = "?", black = "?", tags = {}):
+        self.round = self.round + 1
+        self.tags = [["Event", self.event], ["Site", self.site], ["Date", datetime.date.today().strftime("%Y.%m.%d")],
+                     ["Round", str(self.round)], ["White", white], ["Black", black], ["Result", "*"]]
+        fen = board.getFEN(colour)
+        if fen != startFEN:
+            self.tags = self.tags + [["SetUp", "1"], ["FEN", fen]]
+        self.tags = self.tags + [[key, str(tags[key])] for key in tags]
+        self.moveText = []
+        self.ply = 2*(int(fen.split()[5]) - 1) + colour #plies since the start of the game, for the move numbers
+
+    #Adds the legal move of colour, before it is made on the board, with an optional comment
+    def addMove(self, board, move, colour, comment = None):
+        if self.ply % 2 == 0:
+            self.moveText.append(str(self.ply // 2 + 1) + ".")
+        elif (self.moveText == []) or (self.moveText[-1][-1] == "}"): #black's move after the start or a comment
+            self.moveText.append(str(self.ply // 2 + 1) + "...")
+        self.moveText.append(getSANName(board, move, colour))
+        if comment != None:
+            self.moveText.append("{" + comment.replace("}", ")") + "}")
+        self.ply = self.ply + 1
+
+    #Writes the game in progress with the result ("1-0", "0-1", "1/2-1/2" or "*") and the optional reason of its termination
+    def endGame(self, result, termination = None):
+        if self.tags == None:
+            return
+        self.tags[6][1] = result
+        if termination != None:
+            self.tags.append(["Termination", termination])
+        lines = ['[' + key + ' "' + value.replace('\\', '\\\\').replace('"', '\\"') + '"]' for key, value in self.tags]
+        lines.append("")
+        line = ""
+        for token in self.moveText + [result]:
+            for word in token.split(" "): #comments are wrapped between words
+                if (line != "") and (len(line) + 1 + len(word) > self.lineLength):
+                    lines.append(line)
+                    line = ""
+                line = word if line == "" else line + " " + word
+        lines.append(line)
+        self.file.write("\n".join(lines) + "\n\n")
+        self.file.flush()
+        self.tags = None
+        self.moveText = []
+
+    #Writes the game in progress as unfinished and closes the file
+    def close(self):
+        self.endGame("*")
+        self.file.close()
+
+tagPattern = re.compile(r'\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+tokenPattern = re.compile(r'\[\s*\w+\s+"(?:[^"\\]|\\.)*"\s*\]|\{[^}]*\}?|;.*|\$\d+|\(|\)|[^\s(){};\[]+')
+moveNumberPattern = re.compile(r'^\d+(\.+|$)')
+
+#Reads the games of a PGN file one at a time and replays their moves through ChessBoard.move on board (None: an own board).
+#Yields [tags, moves, result] per game: the tag pairs as dict, the moves [xOrig, yOrig, xDest, yDest(, promotion)]
+#up to the first illegal or unreadable move, and the result ("1-0", "0-1", "1/2-1/2" or "*").
+#While a game is yielded, the board holds its final position. Comments, annotations and variations are skipped
+def readPGN(path, board = None):
+    if board == None:
+        board = ChessBoard()
+    tags, moves, colour, replaying, inComment, variationDepth = {}, [], None, True, False, 0
+    with open(path, encoding = 'utf-8', errors = 'replace') as file:
+        for line in file:
+            if inComment: #continuation of a comment spanning several lines
+                end = line.find("}")
+                if end < 0:
+                    continue
+                line = line[end + 1:]
+                inComment = False
+            if line.startswith("%"): #escaped line
+                continue
+            for token in tokenPattern.findall(line):
+                first = token[0]
+                if first == "[":
+                    if (moves != []) or (colour != None): #tag pairs after the movetext of a game without result
+                        yield [tags, moves, tags.get("Result", "*")]
+                        tags, moves, colour, replaying = {}, [], None, True
+                    key, value = tagPattern.match(token).groups()
+                    tags[key] = value.replace('\\"', '"').replace('\\\\', '\\')
+                elif first == "{":
+                    inComment = not token.endswith("}")
+                elif first in ";$":
+                    continue
+                elif first == "(":
+                    variationDepth = variationDepth + 1
+                elif first == ")":
+                    variationDepth = max(variationDepth - 1, 0)
+                elif variationDepth > 0:
+                    continue
+                elif token in results:
+                    yield [tags, moves, token]
+                    tags, moves, colour, replaying = {}, [], None, True
+                else:
+                    token = moveNumberPattern.sub("", token)
+                    if (token == "") or (not replaying):
+                        continue
+                    if colour == None: #first move: set up the starting position
+                        try:
+                            colour = board.setFEN(tags["FEN"]) if "FEN" in tags else Colour.White
+                        except (ValueError, IndexError):
+                            replaying = False
+                            continue
+                        if "FEN" not in tags:
+                            board.resetBoard()
+                    made = makeSANMove(board, token, colour)
+                    if made == None:
+                        replaying = False
+                        continue
+                    moves.append(made[0])
+                    colour = not colour
+    if (moves != []) or (tags != {}):
+        yield [tags, moves, tags.get("Result", "*")]
+
+#Replays all games of the PGN files given as arguments and reports their number, plies and the replay speed
+def main():
+    for path in sys.argv[1:]:
+        start = time.time()
+        games = 0
+        plies = 0
+        for tags, moves, result in readPGN(path):
+            games = games + 1
+            plies = plies + len(moves)
+        seconds = time.time() - start
+        print(path + ": " + str(games) + " games, " + str(plies) + " plies in " + "%.2f"%seconds + "s, " +
+              str(int(plies / max(seconds, 0.001))) + " plies/s", flush = True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+Pieces of the chess engine: colours, piece values and scoreboards,
+and the generation of each piece's potential moves
+"""
+
+class Colour:
+    
+    White = 0
+    Black = 1   
+
+#Piece instances only hold their colour and the last generated move list (in slots); everything else is per piece type
+class Piece:
+    
+    __slots__ = ['colour', 'moves']
+    index = None #index of the piece type (0-5), used for hashing and evaluation tables
+    phase = 0 #contribution to the game phase (24 = all minor and major pieces on the board, 0 = only kings and pawns)
+    #Directions of movement as differences of square indices on the 0x88 board (ChessBoard.cells, index 16*y + x);
+    #sliding pieces move any number of squares along a direction, the others one step
+    offsets = []
+    slides = False
+    
+    def __init__(self, colour):
+        self.colour = colour
+        self.moves = None
+    
+    #Returns a list of possible moves assuming the piece is at he (x,y) Position on the board
+    #The board is passed in child classes to only generate moves within range of the piece (i.e. to avoid skipping for sliding pieces)
+    #Legality of moves is handled by the board class itself.
+    #Walks the piece's directions on the 0x88 board, where a square index off the board has a bit of 0x88 set
+    def getMoveList(self, x, y, board):
+        self.moves = moves = []
+        cells = board.cells
+        colour = self.colour
+        origin = 16*y + x
+        if self.slides:
+            for offset in self.offsets:
+                square = origin + offset
+                while not square & 0x88:
+                    piece = cells[square]
+                    if piece != None:
+                        if piece.colour != colour:
+                            moves.append([square & 7, square >> 4])
+                        break
+                    moves.append([square & 7, square >> 4])
+                    square = square + offset
+        else:
+            for offset in self.offsets:
+                square = origin + offset
+                if (not square & 0x88) and ((cells[square] == None) or (cells[square].colour != colour)):
+                    moves.append([square & 7, square >> 4])
+        return moves
+    
+    #Returns only captures
+    def getCaptureMoveList(self, x, y, board):
+        self.moves = moves = []
+        cells = board.cells
+        colour = self.colour
+        origin = 16*y + x
+        slides = self.slides
+        for offset in self.offsets:
+            square = origin + offset
+            if slides:
+                while (not square & 0x88) and (cells[square] == None):
+                    square = square + offset
+            if (not square & 0x88) and (cells[square] != None) and (cells[square].colour != colour):
+                moves.append([square & 7, square >> 4])
+        return moves
+    
+class Pawn(Piece):
+    
+    __slots__ = []
+    symbol = 'p'
+    index = 0
+    value = 100
+    #Indices of the pieces a pawn can be promoted to (queen, knight, rook, bishop), in the order in which promotions are generated.
+    #Destinations of promotions are given as [x, y, index of the promotion piece], one per piece
+    promotions = [4, 1, 3, 2]
+    scoreBoard = [[ 0,  0,  0,  0,  0,  0,  0,  0],
+                  [50, 50, 50, 50, 50, 50, 50, 50],
+                  [10, 10, 20, 30, 30, 20, 10, 10],
+                  [5,  5, 10, 25, 25, 10,  5,  5],
+                  [0,  0,  0, 20, 20,  0,  0,  0],
+                  [5, -5,-10,  0,  0,-10, -5,  5],
+                  [5, 10, 10,-20,-20, 10, 10,  5],
+                  [0,  0,  0,  0,  0,  0,  0,  0]]
+    #In the endgame, pawns are valued by how far they are advanced
+    scoreBoardEndgame = [[ 0,  0,  0,  0,  0,  0,  0,  0],
+                         [80, 80, 80, 80, 80, 80, 80, 80],
+                         [50, 50, 50, 50, 50, 50, 50, 50],
+                         [30, 30, 30, 30, 30, 30, 30, 30],
+                         [20, 20, 20, 20, 20, 20, 20, 20],
+                         [10, 10, 10, 10, 10, 10, 10, 10],
+                         [10, 10, 10, 10, 10, 10, 10, 10],
+                         [ 0,  0,  0,  0,  0,  0,  0,  0]]
+    
+    def getMoveList(self, x, y, board):
+        self.moves = moves = []
+        cells = board.cells
+        colour = self.colour
+        if colour == Colour.White:
+            forward = 16
+            yNext = y + 1
+        else:
+            forward = -16
+            yNext = y - 1
+        square = 16*y + x + forward
+        if (not square & 0x88) and (cells[square] == None):
+            moves.append([x, yNext])
+            if (y == (1 if colour == Colour.White else 6)) and (cells[square + forward] == None):
+                moves.append([x, yNext + yNext - y])
+        self.__addCaptures(x, y, yNext, square, cells, board, moves)
+        if (yNext == 7) or (yNext == 0):
+            self.moves = moves = [[mov[0], mov[1], promotion] for mov in moves for promotion in self.promotions]
+        return moves
+        
+    def getCaptureMoveList(self, x, y, board):
+        self.moves = moves = []
+        yNext = y + 1 if self.colour == Colour.White else y - 1
+        self.__addCaptures(x, y, yNext, 16*yNext + x, board.cells, board, moves)
+        if (yNext == 7) or (yNext == 0):
+            self.moves = moves = [[mov[0], mov[1], promotion] for mov in moves for promotion in self.promotions]
+        return moves
+
+    #Appends the diagonal captures and en passant captures of the pawn on x, y, whose step leads to square (index on the 0x88 board)
+    def __addCaptures(self, x, y, yNext, square, cells, board, moves):
+        colour = self.colour
+        if (not (square - 1) & 0x88) and (cells[square - 1] != None) and (cells[square - 1].colour != colour):
+            moves.append([x-1,yNext])
+        if (not (square + 1) & 0x88) and (cells[square + 1] != None) and (cells[square + 1].colour != colour):
+            moves.append([x+1,yNext])
+        if (board.enPassantPawn[1] == y) and (y == (4 if colour == Colour.White else 3)): #check if en passant is possible
+            xPawn = board.enPassantPawn[0]
+            if ((xPawn == x-1) or (xPawn == x+1)) and (cells[16*y + xPawn] != None) and (cells[16*y + xPawn].colour != colour):
+                moves.append([xPawn,yNext])
+
+
+class Knight(Piece):
+    
+    __slots__ = []
+    symbol = 'N'
+    index = 1
+    phase = 1
+    value = 300
+    scoreBoard = [[-50,-40,-30,-30,-30,-30,-40,-50],
+                  [-40,-20,  0,  0,  0,  0,-20,-40],
+                  [-30,  0, 10, 15, 15, 10,  0,-30],
+                  [-30,  5, 15, 20, 20, 15,  5,-30],
+                  [-30,  0, 15, 20, 20, 15,  0,-30],
+                  [-30,  5, 10, 15, 15, 10,  5,-30],
+                  [-40,-20,  0,  5,  5,  0,-20,-40],
+                  [-50,-40,-30,-30,-30,-30,-40,-50]]
+    scoreBoardEndgame = scoreBoard
+    
+    offsets = [31, -33, 33, -31, 14, -18, 18, -14]
+
+    
+class Rook(Piece):
+    
+    __slots__ = []
+    symbol = 'R'
+    index = 3
+    phase = 2
+    value = 500
+    scoreBoard = [[ 0, 0, 0, 0, 0, 0, 0, 0],
+                  [ 5,10,10,10,10,10,10, 5],
+                  [-5, 0, 0, 0, 0, 0, 0,-5],
+                  [-5, 0, 0, 0, 0, 0, 0,-5],
+                  [-5, 0, 0, 0, 0, 0, 0,-5],
+                  [-5, 0, 0, 0, 0, 0, 0,-5],
+                  [-5, 0, 0, 0, 0, 0, 0,-5],
+                  [ 0, 0, 0, 5, 5, 0, 0, 0]]
+    scoreBoardEndgame = scoreBoard
+                  
+    offsets = [-1, 1, 16, -16]
+    slides = True
+
+
+class Bishop(Piece):
+    
+    __slots__ = []
+    symbol = 'B'
+    index = 2
+    phase = 1
+    value = 300
+    scoreBoard = [[-20,-10,-10,-10,-10,-10,-10,-20],
+                  [-10,  0,  0,  0,  0,  0,  0,-10],
+                  [-10,  0,  5, 10, 10,  5,  0,-10],
+                  [-10,  5,  5, 10, 10,  5,  5,-10],
+                  [-10,  0, 10, 10, 10, 10,  0,-10],
+                  [-10, 10, 10, 10, 10, 10, 10,-10],
+                  [-10,  5,  0,  0,  0,  0,  5,-10],
+                  [-20,-10,-10,-10,-10,-10,-10,-20]]
+    scoreBoardEndgame = scoreBoard
+    
+    offsets = [15, -17, -15, 17]
+    slides = True
+
+    
+class Queen(Piece):
+    
+    __slots__ = []
+    symbol = 'Q'
+    index = 4
+    phase = 4
+    value = 900
+    scoreBoard = [[-20,-10,-10, -5, -5,-10,-10,-20],
+                  [-10,  0,  0,  0,  0,  0,  0,-10],
+                  [-10,  0,  5,  5,  5,  5,  0,-10],
+                  [-5,  0,  5,  5,  5,  5,  0, -5],
+                  [0,  0,  5,  5,  5,  5,  0, -5],
+                  [-10,  5,  5,  5,  5,  5,  0,-10],
+                  [-10,  0,  5,  0,  0,  0,  0,-10],
+                  [-20,-10,-10, -5, -5,-10,-10,-20]]
+    scoreBoardEndgame = scoreBoard
+    
+    offsets = [15, -17, -15, 17, -1, 1, 16, -16]
+    slides = True
+
+              
+class King(Piece):
+    
+    __slots__ = []
+    symbol = 'K'
+    index = 5
+    value = 30000
+    scoreBoard = [[-30,-40,-40,-50,-50,-40,-40,-30],
+                  [-30,-40,-40,-50,-50,-40,-40,-30],
+                  [-30,-40,-40,-50,-50,-40,-40,-30],
+                  [-30,-40,-40,-50,-50,-40,-40,-30],
+                  [-20,-30,-30,-40,-40,-30,-30,-20],
+                  [-10,-20,-20,-20,-20,-20,-20,-10],
+                  [20, 20,  0,  0,  0,  0, 20, 20],
+                  [20, 30, 10,  0,  0, 10, 30, 20]]
+    #In the endgame, the king should be centralized instead of sheltering on the back rank
+    scoreBoardEndgame = [[-50,-40,-30,-20,-20,-30,-40,-50],
+                         [-30,-20,-10,  0,  0,-10,-20,-30],
+                         [-30,-10, 20, 30, 30, 20,-10,-30],
+                         [-30,-10, 30, 40, 40, 30,-10,-30],
+                         [-30,-10, 30, 40, 40, 30,-10,-30],
+                         [-30,-10, 20, 30, 30, 20,-10,-30],
+                         [-30,-30,  0,  0,  0,  0,-30,-30],
+                         [-50,-30,-30,-30,-30,-30,-30,-50]]
+    
+    offsets = [15, -17, -15, 17, 1, -1, 16, -16]
+    #Castlings as [right (bit of the board's castling rights), rank, king's destination file, rook's origin and destination file,
+    #files between king and rook (which must be empty), files of the king's path (which must not be attacked)], in the order of the FEN's "KQkq"
+    castlings = [[2, 0, 6, 7, 5, [5, 6], [4, 5, 6]],
+                 [1, 0, 2, 0, 3, [1, 2, 3], [4, 3, 2]],
+                 [8, 7, 6, 7, 5, [5, 6], [4, 5, 6]],
+                 [4, 7, 2, 0, 3, [1, 2, 3], [4, 3, 2]]]
+    
+    #Castlings are generated if the side has the right and the squares between king and rook are empty;
+    #whether the king's path is attacked is checked when the move is made
+    def getMoveList(self, x, y, board):
+        Piece.getMoveList(self, x, y, board)
+        rights = board.castlingRights & (3 if self.colour == Colour.White else 12)
+        if rights:
+            squares = board.squares
+            for castling in self.castlings:
+                if (rights & castling[0]) and (y == castling[1]) and (x == 4) and all(squares[file][y] == None for file in castling[5]):
+                    self.moves.append([castling[2], y])
+        return self.moves   
+
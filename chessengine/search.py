@@ -0,0 +1,1047 @@
+# -*- coding: utf-8 -*-
+"""
+Search of the chess engine
+- Includes alphabeta pruning, quiescence searches and iterative deepening
+- Time management, and pondering in a background thread
+"""
+
+import time, random, copy, threading
+from .pieces import Colour, Pawn, Knight, Bishop, Rook, Queen, King
+from .board import getMoveName, getZobrist, getPieceSquareTables
+from .evaluation import PieceSquareTables, PawnHashTable, EvaluationCache
+from .transposition import TranspositionTable
+from .config import EngineConfig
+
+#Decides how long an iterative deepening search may run.
+#Two modes are supported: a fixed time per move, or a game clock (remaining time plus increment).
+#Between iterations, the time of the next iteration is predicted from the effective branching factor,
+#so that no iteration is started which cannot finish within the hard limit (its partial results would be discarded).
+#The soft limit is extended if the best move changes or the score drops, and shrunk if the best move is stable.
+class TimeManager:
+
+    #Share of a fixed move time that is targeted if the search is stable (the rest is reserved for extensions)
+    moveTimeShare = 0.6
+    #Number of moves the remaining clock time is divided across if the number of moves to go is unknown
+    defaultMovesToGo = 30
+    #Never use more than this share of the remaining clock time on a single move
+    maxClockShare = 0.5
+    #Time reserved on the clock to account for overhead outside of the search
+    clockMargin = 0.05
+
+    #Scaling of the soft limit in reaction to the search behaviour
+    instabilityFactor = 1.4 #best move changed
+    scoreDropFactor = 1.3 #score dropped by more than scoreDropMargin
+    scoreDropMargin = 30
+    stabilityFactor = 0.75 #best move unchanged for stableIterations iterations
+    stableIterations = 3
+    minScale = 0.4
+    maxScale = 2.5
+
+    #Bounds of the effective branching factor used to predict the next iteration's time
+    minBranchingFactor = 2
+    maxBranchingFactor = 20
+
+    def __init__(self, moveTime = None, remaining = None, increment = 0, movesToGo = None):
+        self.moveTime = moveTime
+        self.remaining = remaining
+        self.increment = increment
+        self.movesToGo = movesToGo
+        self.startTime = time.time()
+        self.softLimit = 0
+        self.hardLimit = 0
+        self.scale = 1.0
+        self.iterationTimes = []
+        self.lastIterationEnd = 0
+        self.bestMove = None
+        self.bestValue = None
+        self.stableCount = 0
+
+    #Computes soft and hard limits from the time control
+    def computeLimits(self):
+        if self.remaining != None: #game clock
+            movesToGo = self.movesToGo if self.movesToGo else self.defaultMovesToGo
+            available = max(self.remaining - self.clockMargin, 0)
+            self.softLimit = available / movesToGo + self.increment * 0.75
+            self.hardLimit = min(available * self.maxClockShare, self.softLimit * self.maxScale * 2)
+            self.softLimit = min(self.softLimit, self.hardLimit)
+        elif self.moveTime != None: #fixed time per move
+            self.hardLimit = self.moveTime
+            self.softLimit = self.moveTime * self.moveTimeShare
+        else: #no time control (e.g. while pondering), search until stopped
+            self.hardLimit = float('inf')
+            self.softLimit = float('inf')
+
+    #Computes the limits and starts the clock for a new move
+    def startMove(self):
+        self.computeLimits()
+        self.scale = 1.0
+        self.iterationTimes = []
+        self.lastIterationEnd = 0
+        self.bestMove = None
+        self.bestValue = None
+        self.stableCount = 0
+        self.startTime = time.time()
+
+    #Switches a search without time control (pondering) to the given time control.
+    #The clock restarts now, i.e. the time spent pondering is free, while the iterations finished so far are kept.
+    def ponderHit(self, moveTime = None, remaining = None, increment = 0, movesToGo = None):
+        self.moveTime = moveTime
+        self.remaining = remaining
+        self.increment = increment
+        self.movesToGo = movesToGo
+        self.computeLimits()
+        now = time.time()
+        self.lastIterationEnd = self.lastIterationEnd - (now - self.startTime)
+        self.startTime = now
+
+    def elapsed(self):
+        return time.time() - self.startTime
+
+    #The search is aborted mid-iteration once this returns true
+    def hardLimitReached(self):
+        return self.elapsed() > self.hardLimit
+
+    #Records a finished iteration; value is given from the perspective of the side to move
+    def iterationFinished(self, bestMove, value):
+        now = self.elapsed()
+        self.iterationTimes.append(now - self.lastIterationEnd)
+        self.lastIterationEnd = now
+        if self.bestMove != None:
+            if bestMove != self.bestMove:
+                self.stableCount = 0
+                self.scale = self.scale * self.instabilityFactor
+            else:
+                self.stableCount = self.stableCount + 1
+                if self.stableCount >= self.stableIterations:
+                    self.scale = self.scale * self.stabilityFactor
+            if self.bestValue - value > self.scoreDropMargin:
+                self.scale = self.scale * self.scoreDropFactor
+        self.scale = min(max(self.scale, self.minScale), self.maxScale)
+        self.bestMove = bestMove
+        self.bestValue = value
+
+    #Predicted duration of the next iteration, based on the effective branching factor of the last iterations
+    #(geometric mean of the last two time ratios, to smooth out the odd-even effect of alpha-beta)
+    def predictNextIteration(self):
+        if len(self.iterationTimes) < 2:
+            return 0
+        ratios = []
+        for i in range(max(len(self.iterationTimes) - 2, 1), len(self.iterationTimes)):
+            if self.iterationTimes[i-1] > 0:
+                ratios.append(self.iterationTimes[i] / self.iterationTimes[i-1])
+            else:
+                ratios.append(self.maxBranchingFactor)
+        branchingFactor = 1
+        for ratio in ratios:
+            branchingFactor = branchingFactor * ratio
+        branchingFactor = branchingFactor ** (1 / len(ratios))
+        branchingFactor = min(max(branchingFactor, self.minBranchingFactor), self.maxBranchingFactor)
+        return self.iterationTimes[-1] * branchingFactor
+
+    #Returns true if another iteration should be started
+    def continueSearch(self):
+        elapsed = self.elapsed()
+        if elapsed >= min(self.softLimit * self.scale, self.hardLimit):
+            return False
+        if elapsed + self.predictNextIteration() > self.hardLimit: #the next iteration would be aborted anyway
+            return False
+        return True
+
+class Engine:
+    
+    #Worst-case valuation for white resp. black (and conversely, best-case valuation for the opponent).
+    #Capturing the king at ply depth is valued __blackMax - depth resp. __whiteMin + depth, so that faster mates are preferred
+    __whiteMin = -99999
+    __blackMax = 99999
+    
+    #Pawn structure terms as [middlegame, endgame] values; passed pawn bonuses are indexed by the rank relative to the pawn's colour
+    doubledPawnPenalty = [10, 20]
+    isolatedPawnPenalty = [10, 15]
+    passedPawnBonus = [[0, 5, 10, 15, 25, 40, 60, 0],
+                       [0, 10, 20, 35, 55, 80, 110, 0]]
+
+    #All search state is kept per instance (in slots), so that several engines can search concurrently in one process
+    __slots__ = ['config', 'timeLimit', 'timeManager', '__iterativeDeepening', '__abortSearch',
+                 'randomness', 'rand_limit', 'randomMode', 'seed', 'rng', 'randomSalt', 'quiescenceLimit', 'extensionLimit',
+                 'searchDepth', 'captures', 'nodes', 'depthLimit', 'nodeLimit', 'completedDepth', 'bestValue', 'multiPV', 'multiPVLines',
+                 'analysisCache', 'searchStart', 'verbose', 'pawnTable', 'evalCache', 'transpositionTable',
+                 'turnSequence', 'currentTurnSequence', 'pvTable', 'previousPV', 'followPV', 'killers']
+
+    #The engine takes its settings from config (None: the default EngineConfig)
+    def __init__(self, seed = None, config = None):
+        self.config = EngineConfig() if config == None else config
+
+        #Control variables for iterative deepening search
+        self.timeLimit = 5
+        self.timeManager = None
+        self.__iterativeDeepening = True
+        self.__abortSearch = False
+
+        #Evaluation variations, see EngineConfig
+        self.randomness = self.config.randomness
+        self.rand_limit = self.config.rand_limit
+        self.randomMode = self.config.randomMode
+        self.setSeed(seed)
+
+        #Quiescence search and search extensions, see EngineConfig
+        self.quiescenceLimit = self.config.quiescenceLimit
+        self.extensionLimit = self.config.extensionLimit
+
+        #Depth of the running iteration (i.e. without extensions), and the captures along the current path as [x, y, value of the captured piece] (None: no capture)
+        self.searchDepth = 0
+        self.captures = []
+
+        #Counts the visited positions
+        self.nodes = 0
+
+        #Optional limits of iterative deepening searches in addition to the time manager (None: unlimited):
+        #the maximum depth, and the number of nodes after which the search is aborted
+        self.depthLimit = None
+        self.nodeLimit = None
+
+        #Depth and valuation (white positive) of the last fully searched iteration
+        self.completedDepth = 0
+        self.bestValue = None
+
+        #Number of best root moves searched with exact valuations (Multi-PV); their lines are stored in multiPVLines
+        #as [move, valuation (white positive), principal variation], best first
+        self.multiPV = 1
+        self.multiPVLines = []
+
+        #Optional persistent cache of search results (AnalysisCache), consulted before searching:
+        #results of sufficient depth are returned directly, otherwise the cached best move is searched first
+        self.analysisCache = None
+
+        #Index of the root position in the board's hash history; repetitions after it are scored as draw
+        self.searchStart = 0
+
+        #If false, no search progress or results are printed (e.g. for searches running in the background)
+        self.verbose = True
+
+        #turnSequence stores the principal variation of the last search (turnSequence[0] being the best found move, padded with [-1,-1,-1,-1]),
+        #currentTurnSequence stores the entire turn sequence that the engine currently looks at
+        self.turnSequence = []
+        self.currentTurnSequence = []
+
+        #Triangular principal variation table: pvTable[depth] is the best line found from the node at depth of the current path,
+        #composed of the node's best move and the line of its child when the move improves the valuation
+        self.pvTable = []
+        #Principal variation of the previous iteration, whose moves are searched first while the search follows it (followPV)
+        self.previousPV = []
+        self.followPV = False
+        #Killer moves: per depth the last two quiet moves that caused a cutoff, kept across the iterations of a search
+        self.killers = []
+
+        #The transposition table, pawn hash table and evaluation cache are kept across searches
+        self.allocateTables()
+
+    #(Re)allocates the empty hash tables within the memory budget of the config; raises ValueError if they do not fit
+    def allocateTables(self):
+        transpositionTableSize, pawnTableSize, evalCacheSize = self.config.getTableSizes()
+        self.pawnTable = PawnHashTable(pawnTableSize)
+        self.evalCache = EvaluationCache(evalCacheSize, self.config.evalCachePolicy)
+        self.transpositionTable = TranspositionTable(transpositionTableSize)
+
+    #Returns the estimated memory of the engine's hash tables in bytes
+    def getMemoryUsage(self):
+        return self.transpositionTable.getMemoryUsage() + self.pawnTable.getMemoryUsage() + self.evalCache.getMemoryUsage()
+
+    #Reseeds the engine's random number generator (None: seeded from system randomness)
+    def setSeed(self, seed):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.randomSalt = self.rng.getrandbits(64) #mixed into the position hash in 'hash' mode
+
+    #Returns the pseudorandom variation of the evaluation, between -rand_limit and rand_limit
+    def getRandomVariation(self, board):
+        if self.randomMode == 'hash':
+            return (board.hash ^ self.randomSalt) % (2*self.rand_limit + 1) - self.rand_limit
+        return self.rng.randint(-self.rand_limit, self.rand_limit)
+            
+    #Simple heuristic evaluation function of the entire board
+    #Incorporates the material balance as well as positional strength.
+    #The board keeps middlegame and endgame scores updated with each move; they are interpolated
+    #by the game phase (tapered evaluation), so that e.g. the king is centralized once the pieces are traded
+    #Pawn structure terms are looked up in the pawn hash table, and only computed for new pawn configurations.
+    #Evaluations are cached by position hash; the random variation is applied after the lookup
+    def evaluatePositionAlphaBeta(self, board):
+        val = None
+        if self.evalCache.size > 0:
+            val = self.evalCache.get(board.hash)
+        if val == None:
+            pawnScores = self.pawnTable.get(board.pawnHash)
+            if pawnScores == None:
+                pawnScores = self.evaluatePawnStructure(board)
+                self.pawnTable.store(board.pawnHash, pawnScores)
+            phase = min(board.phase, PieceSquareTables.maxPhase)
+            val = (((board.scoreMiddlegame + pawnScores[0]) * phase + (board.scoreEndgame + pawnScores[1]) * (PieceSquareTables.maxPhase - phase))
+                   // PieceSquareTables.maxPhase)
+            if self.evalCache.size > 0:
+                self.evalCache.store(board.hash, val)
+        if self.randomness:
+            val = val + self.getRandomVariation(board)
+        return val
+
+    #Returns the [middlegame, endgame] score of the pawn structure (white positive):
+    #penalties for doubled and isolated pawns, bonuses for passed pawns
+    def evaluatePawnStructure(self, board):
+        pawnRanks = [[[] for x in range(8)], [[] for x in range(8)]] #ranks of the pawns, indexed by colour and file
+        for colour in [Colour.White, Colour.Black]:
+            for square in board.pieceSquares[2*Pawn.index + colour]:
+                pawnRanks[colour][square & 7].append(square >> 4)
+        scores = [0, 0]
+        for colour in [Colour.White, Colour.Black]:
+            sign = 1 if colour == Colour.White else -1
+            own = pawnRanks[colour]
+            opponent = pawnRanks[1 - colour]
+            for x in range(8):
+                if own[x] == []:
+                    continue
+                if len(own[x]) > 1:
+                    for phase in range(2):
+                        scores[phase] = scores[phase] - sign * self.doubledPawnPenalty[phase] * (len(own[x]) - 1)
+                if ((x == 0) or (own[x-1] == [])) and ((x == 7) or (own[x+1] == [])):
+                    for phase in range(2):
+                        scores[phase] = scores[phase] - sign * self.isolatedPawnPenalty[phase] * len(own[x])
+                for y in own[x]:
+                    passed = True
+                    for file in range(max(x-1, 0), min(x+1, 7) + 1):
+                        for yOpponent in opponent[file]:
+                            if (colour == Colour.White and yOpponent > y) or (colour == Colour.Black and yOpponent < y):
+                                passed = False
+                    if passed:
+                        rank = y if colour == Colour.White else 7 - y
+                        for phase in range(2):
+                            scores[phase] = scores[phase] + sign * self.passedPawnBonus[phase][rank]
+        return scores
+
+    #Converts the boards to an (N, 12, 64) occupancy tensor, indexed by [board][2*piece.index + piece.colour][8*x + y]
+    #Requires NumPy (imported on demand, as the engine itself does not depend on it)
+    def getOccupancyTensor(self, boards):
+        import numpy
+        indices = [[], [], []]
+        for i in range(len(boards)):
+            squares = boards[i].squares
+            for x in range(8):
+                for y in range(8):
+                    if squares[x][y] != None:
+                        indices[0].append(i)
+                        indices[1].append(2*squares[x][y].index + squares[x][y].colour)
+                        indices[2].append(8*x + y)
+        occupancy = numpy.zeros((len(boards), 12, 64), dtype = numpy.int8)
+        occupancy[indices[0], indices[1], indices[2]] = 1
+        return occupancy
+
+    #Material plus positional value of each piece type and colour on each square as (12, 64) array,
+    #in the layout of getOccupancyTensor (white pieces valued positively, black pieces negatively)
+    def getPieceSquareWeights(self, endgame = False):
+        import numpy
+        if endgame:
+            return numpy.array(getPieceSquareTables().endgame, dtype = numpy.int64)
+        return numpy.array(getPieceSquareTables().middlegame, dtype = numpy.int64)
+
+    #Pawn structure scores ([middlegame, endgame], white positive) of an occupancy tensor as (N, 2) array,
+    #the vectorised equivalent of evaluatePawnStructure
+    def evaluatePawnStructureBatch(self, occupancy):
+        import numpy
+        pawns = occupancy.reshape(len(occupancy), 12, 8, 8)[:, 2*Pawn.index:2*Pawn.index + 2].astype(numpy.int32) #[board][colour][file][rank]
+        ranks = numpy.arange(8)
+        counts = pawns.sum(axis = 3)
+        occupied = counts > 0
+        neighbours = numpy.zeros(occupied.shape, dtype = bool)
+        neighbours[:, :, 1:] = occupied[:, :, :-1]
+        neighbours[:, :, :-1] = neighbours[:, :, :-1] | occupied[:, :, 1:]
+        doubled = numpy.maximum(counts - 1, 0).sum(axis = 2)
+        isolated = (counts * ~neighbours).sum(axis = 2)
+        #most advanced black pawn resp. least advanced white pawn per file, widened to the adjacent files
+        blackMax = numpy.where(pawns[:, Colour.Black] > 0, ranks, -1).max(axis = 2)
+        whiteMin = numpy.where(pawns[:, Colour.White] > 0, ranks, 8).min(axis = 2)
+        blackMaxWindow = blackMax.copy()
+        blackMaxWindow[:, 1:] = numpy.maximum(blackMaxWindow[:, 1:], blackMax[:, :-1])
+        blackMaxWindow[:, :-1] = numpy.maximum(blackMaxWindow[:, :-1], blackMax[:, 1:])
+        whiteMinWindow = whiteMin.copy()
+        whiteMinWindow[:, 1:] = numpy.minimum(whiteMinWindow[:, 1:], whiteMin[:, :-1])
+        whiteMinWindow[:, :-1] = numpy.minimum(whiteMinWindow[:, :-1], whiteMin[:, 1:])
+        whitePassed = pawns[:, Colour.White] * (blackMaxWindow[:, :, None] <= ranks)
+        blackPassed = pawns[:, Colour.Black] * (whiteMinWindow[:, :, None] >= ranks)
+        scores = numpy.zeros((len(occupancy), 2), dtype = numpy.int64)
+        for phase in range(2):
+            bonus = numpy.array(self.passedPawnBonus[phase], dtype = numpy.int64)
+            scores[:, phase] = (-(doubled[:, Colour.White] - doubled[:, Colour.Black]) * self.doubledPawnPenalty[phase]
+                                - (isolated[:, Colour.White] - isolated[:, Colour.Black]) * self.isolatedPawnPenalty[phase]
+                                + (whitePassed.sum(axis = 1) * bonus).sum(axis = 1)
+                                - (blackPassed.sum(axis = 1) * bonus[::-1]).sum(axis = 1))
+        return scores
+
+    #Game phase contribution of each piece type and colour on each square as (12, 64) array
+    def getPhaseWeights(self):
+        import numpy
+        weights = numpy.zeros((12, 64), dtype = numpy.int64)
+        for pieceType in [Pawn, Knight, Bishop, Rook, Queen, King]:
+            weights[2*pieceType.index:2*pieceType.index + 2, :] = pieceType.phase
+        return weights
+
+    #Number of positions per dot product in evaluatePositionsBatch (bounds the temporary float32 copy of the occupancy)
+    batchChunkSize = 8192
+
+    #Batch version of evaluatePositionAlphaBeta for scoring large numbers of positions at once:
+    #middlegame and endgame scores and the game phase of all boards are computed with a single dot product of
+    #the occupancy tensor with the stacked weights, then the pawn structure is added and the scores are interpolated.
+    #Returns an int64 array of length N.
+    #Accepts a list of boards or an occupancy tensor created by getOccupancyTensor.
+    #The product is computed in float32 chunks, which is exact as all partial sums stay far below 2^24.
+    def evaluatePositionsBatch(self, boards):
+        import numpy
+        if isinstance(boards, numpy.ndarray):
+            occupancy = boards
+        else:
+            occupancy = self.getOccupancyTensor(boards)
+        occupancy = occupancy.reshape(len(occupancy), 12*64)
+        weights = numpy.stack([self.getPieceSquareWeights().reshape(12*64), self.getPieceSquareWeights(True).reshape(12*64),
+                               self.getPhaseWeights().reshape(12*64)], axis = 1).astype(numpy.float32)
+        scores = numpy.empty((len(occupancy), 3), dtype = numpy.int64)
+        for start in range(0, len(occupancy), self.batchChunkSize):
+            chunk = occupancy[start:start + self.batchChunkSize].astype(numpy.float32)
+            scores[start:start + self.batchChunkSize] = numpy.rint(numpy.dot(chunk, weights))
+        scores[:, 0:2] = scores[:, 0:2] + self.evaluatePawnStructureBatch(occupancy)
+        phase = numpy.minimum(scores[:, 2], PieceSquareTables.maxPhase)
+        values = (scores[:, 0] * phase + scores[:, 1] * (PieceSquareTables.maxPhase - phase)) // PieceSquareTables.maxPhase
+        if self.randomness:
+            if self.randomMode == 'hash': #same variation as getRandomVariation, from the Zobrist hashes of the occupancies
+                keys = numpy.array(getZobrist().pieces, dtype = numpy.uint64).reshape(12*64)
+                hashes = numpy.empty(len(occupancy), dtype = numpy.uint64)
+                for start in range(0, len(occupancy), self.batchChunkSize):
+                    chunk = occupancy[start:start + self.batchChunkSize]
+                    hashes[start:start + self.batchChunkSize] = numpy.bitwise_xor.reduce(numpy.where(chunk != 0, keys, numpy.uint64(0)), axis = 1)
+                values = values + ((hashes ^ numpy.uint64(self.randomSalt)) % numpy.uint64(2*self.rand_limit + 1)).astype(numpy.int64) - self.rand_limit
+            else:
+                generator = numpy.random.default_rng(self.rng.getrandbits(64))
+                values = values + generator.integers(-self.rand_limit, self.rand_limit + 1, len(values))
+        return values
+    
+    #Depth-limited Quiescence-Search to limit the Horizon effect:
+    #Traverse only moves that result in a piece being taken,
+    #after the alphabeta search across all potential moves up to a given depth is finished
+    def quietSearch(self, board, colour, depth, maxDepth, alpha, beta):     
+        self.pvTable[depth] = []
+        self.updateSearchProgress(alpha, beta)
+        if board.isKingAttacked(not colour): #the previous move was illegal: the king is captured at once
+            return self.__blackMax - depth if colour == Colour.White else self.__whiteMin + depth
+        value = self.evaluatePositionAlphaBeta(board)
+        if depth == maxDepth:   
+            return value
+        if colour == Colour.White: #white maximizes  
+            for x, y in board.getPieceLocations(colour):
+                board.squares[x][y].getCaptureMoveList(x, y, board)
+                potentialMoves = [mov for mov in board.squares[x][y].moves]
+                for mov in potentialMoves:   
+                    if (board.squares[mov[0]][mov[1]] != None) and (board.squares[mov[0]][mov[1]].colour == (not colour)) and ((len(mov) == 2) or (mov[2] == Queen.index)):
+                        self.nodes = self.nodes + 1 
+                        move = board.move(x, y, *mov) 
+                        if (move.validMove):
+                            self.currentTurnSequence[depth] = [x, y] + mov
+                            if isinstance(move.pieceTaken,King):
+                                board.revertMove(move) 
+                                return self.__blackMax - depth
+                            valueNew = self.quietSearch(board,not colour, depth + 1, maxDepth, alpha,beta)
+                            board.revertMove(move)
+                            self.currentTurnSequence[depth] = []
+                            if valueNew > value:
+                                value = valueNew
+                                self.pvTable[depth] = [[x, y] + mov] + self.pvTable[depth + 1]
+                            if value > alpha:
+                                alpha = value
+                            if alpha >= beta:
+                                return value        
+        else:
+            for x, y in board.getPieceLocations(colour):
+                board.squares[x][y].getCaptureMoveList(x, y, board)
+                potentialMoves = [mov for mov in board.squares[x][y].moves]
+                for mov in potentialMoves:
+                    if board.squares[mov[0]][mov[1]] != None and (board.squares[mov[0]][mov[1]].colour == (not colour)) and ((len(mov) == 2) or (mov[2] == Queen.index)):
+                        self.nodes = self.nodes + 1              
+                        move = board.move(x, y, *mov) 
+                        if (move.validMove):
+                            self.currentTurnSequence[depth] = [x, y] + mov
+                            if isinstance(move.pieceTaken,King):
+                                board.revertMove(move)
+                                return self.__whiteMin + depth
+                            valueNew = self.quietSearch(board,not colour, depth + 1, maxDepth, alpha, beta)
+                            board.revertMove(move)
+                            self.currentTurnSequence[depth] = []
+                            if valueNew < value:
+                                value = valueNew
+                                self.pvTable[depth] = [[x, y] + mov] + self.pvTable[depth + 1]
+                            if value < beta:
+                                beta = value
+                            if alpha >= beta:
+                                return value
+        return value 
+    
+    def alphaBeta(self, board, colour, depth, maxDepth, alpha, beta):
+        self.pvTable[depth] = []
+        if (depth > 0) and board.isKingAttacked(not colour): #the previous move was illegal: the king is captured at once
+            return self.__blackMax - depth if colour == Colour.White else self.__whiteMin + depth
+        if (depth > 0) and board.isDrawByRule(self.searchStart, colour): #a checkmate on the 100th halfmove is no draw
+            return 0
+        if (depth == maxDepth) or (self.__abortSearch): 
+            return self.quietSearch(board, colour, depth, maxDepth + self.quiescenceLimit, alpha, beta)
+        #Mate distance pruning: the valuation of this node lies between the fastest possible mates of either side,
+        #i.e. capturing the king with this node's move resp. the opponent's next move
+        if colour == Colour.White:
+            if self.__blackMax - depth <= alpha:
+                return self.__blackMax - depth
+            if self.__whiteMin + depth + 1 >= beta:
+                return self.__whiteMin + depth + 1
+        else:
+            if self.__whiteMin + depth >= beta:
+                return self.__whiteMin + depth
+            if self.__blackMax - depth - 1 <= alpha:
+                return self.__blackMax - depth - 1
+        key = board.getHash(colour)
+        #The move searched first: on the previous iteration's principal variation its move,
+        #else the best move of an earlier search of this position from the transposition table
+        hashMove = None
+        if self.followPV and (depth < len(self.previousPV)) and self.isPossibleMove(board, colour, self.previousPV[depth]):
+            hashMove = self.previousPV[depth]
+        else:
+            self.followPV = False
+            hashMove = self.getHashMove(board, colour, key)
+        bestMove = None
+        if colour == Colour.White: #white maximizes
+            value = self.__whiteMin
+            for mov in self.pickMoves(board, colour, depth, hashMove):
+                self.nodes = self.nodes + 1 
+                move = board.move(*mov)                            
+                if (move.validMove):
+                    self.currentTurnSequence[depth] = mov   
+                    if isinstance(move.pieceTaken,King):
+                        board.revertMove(move) 
+                        return self.__blackMax - depth
+                    valueNew = self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)
+                    self.followPV = False
+                    if valueNew > value:
+                        value = valueNew
+                        bestMove = mov
+                    if value > alpha:
+                        self.pvTable[depth] = [mov] + self.pvTable[depth + 1]
+                        alpha = value                         
+                    board.revertMove(move) 
+                    self.currentTurnSequence[depth] = []
+                    if alpha >= beta:
+                        if move.pieceTaken == None:
+                            self.storeKiller(mov, depth)
+                        self.transpositionTable.store(key, bestMove)
+                        return value
+        else:
+            value = self.__blackMax
+            for mov in self.pickMoves(board, colour, depth, hashMove):
+                self.nodes = self.nodes + 1 
+                move = board.move(*mov)                           
+                if (move.validMove):    
+                    if isinstance(move.pieceTaken,King):
+                        board.revertMove(move) 
+                        return self.__whiteMin + depth
+                    self.currentTurnSequence[depth] = mov
+                    valueNew = self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)
+                    self.followPV = False
+                    if valueNew < value:
+                        value = valueNew
+                        bestMove = mov
+                    if value < beta:
+                        self.pvTable[depth] = [mov] + self.pvTable[depth + 1]
+                        beta = value
+                    board.revertMove(move)  
+                    self.currentTurnSequence[depth] = []
+                    if alpha >= beta:
+                        if move.pieceTaken == None:
+                            self.storeKiller(mov, depth)
+                        self.transpositionTable.store(key, bestMove)
+                        return value
+        #Every move loses the king at once: checkmate if the king is attacked, else stalemate.
+        #Either way the line ends here, without the (illegal) move that was searched last
+        if value == (self.__whiteMin + depth + 1 if colour == Colour.White else self.__blackMax - depth - 1):
+            self.pvTable[depth] = []
+            if not board.isKingAttacked(colour):
+                return 0
+        if bestMove != None:
+            self.transpositionTable.store(key, bestMove)
+        return value
+
+    #Returns the number of plies (0 or 1) by which the search of the position after move, made at depth, is extended:
+    #checks and recaptures are extended as long as the line has not used up its extensions (the difference between
+    #maxDepth and the iteration's depth). Also records the move's capture for recaptures further down the line
+    def getExtension(self, board, move, depth, maxDepth):
+        self.captures[depth] = [move.dest[0], move.dest[1], move.pieceTaken.value] if move.pieceTaken != None else None
+        if maxDepth - self.searchDepth >= self.extensionLimit:
+            return 0
+        if (depth > 0) and (self.captures[depth] != None) and (self.captures[depth - 1] == self.captures[depth]):
+            return 1
+        if board.isKingAttacked(not move.pieceMoved.colour):
+            return 1
+        return 0
+
+    #Staged move picker: yields the moves [xOrig, yOrig, xDest, yDest] of colour in the order hash move, winning captures
+    #(most valuable victim first, then least valuable attacker), killer moves, quiet moves and losing captures.
+    #A stage is only generated when the previous one is exhausted, so that a cutoff skips the generation of the remaining moves
+    def pickMoves(self, board, colour, depth, hashMove):
+        if hashMove != None:
+            yield hashMove
+        squares = board.squares
+        locations = board.getPieceLocations(colour)
+        winning = []
+        losing = []
+        for x, y in locations:
+            piece = squares[x][y]
+            attacker = 0 if isinstance(piece, King) else piece.value
+            for mov in piece.getCaptureMoveList(x, y, board):
+                victim = Pawn.value if squares[mov[0]][mov[1]] == None else squares[mov[0]][mov[1]].value #empty: en passant
+                capture = [1000*victim - attacker, [x, y] + mov]
+                if (victim >= attacker) and ((len(mov) == 2) or (mov[2] == Queen.index)): #underpromotions are searched last
+                    winning.append(capture)
+                else:
+                    losing.append(capture)
+        winning.sort(key = lambda capture: -capture[0])
+        for capture in winning:
+            if capture[1] != hashMove:
+                yield capture[1]
+        killers = [mov for mov in self.killers[depth] if (mov != hashMove) and (squares[mov[2]][mov[3]] == None) and self.isPossibleMove(board, colour, mov)]
+        for mov in killers:
+            yield mov
+        for x, y in locations:
+            piece = squares[x][y]
+            isPawn = isinstance(piece, Pawn)
+            for mov in piece.getMoveList(x, y, board):
+                if (squares[mov[0]][mov[1]] != None) or (isPawn and (mov[0] != x)): #captures are searched in the other stages
+                    continue
+                quietMove = [x, y] + mov
+                if (quietMove != hashMove) and (not quietMove in killers):
+                    yield quietMove
+        losing.sort(key = lambda capture: -capture[0])
+        for capture in losing:
+            if capture[1] != hashMove:
+                yield capture[1]
+
+    #Stores a quiet move that caused a cutoff at depth as the first of the depth's two killer moves,
+    #which are searched early in the positions of the same depth (i.e. in sibling positions)
+    def storeKiller(self, move, depth):
+        killers = self.killers[depth]
+        if (killers == []) or (killers[0] != move):
+            self.killers[depth] = [move] + killers[:1]
+
+    #Returns the transposition table's move of the position if it is a possible move of colour, else None
+    def getHashMove(self, board, colour, key):
+        move = self.transpositionTable.getMove(key)
+        if (move == None) or (not self.isPossibleMove(board, colour, move)):
+            return None
+        return move
+
+    #Returns true if the piece of colour at the origin of move can move to its destination (disregarding checks)
+    def isPossibleMove(self, board, colour, move):
+        piece = board.squares[move[0]][move[1]]
+        return (piece != None) and (piece.colour == colour) and (move[2:] in piece.getMoveList(move[0], move[1], board))
+    
+    #Depth 0-part of the game tree search is handled in this routine:
+    #The difference to the above alphaBeta-Routine is that the preferred move 
+    #(passed as firstMove) is executed first.
+    #The purpose is to make use of previous (lower maxDepth) search results of
+    #iterative deepening, which should typically result in a lot of pruned moves
+    def alphaBeta_depth0(self, board, colour, depth, maxDepth, alpha, beta, firstMove):
+        if firstMove == None:
+            return self.alphaBeta(board, colour, depth, maxDepth, alpha, beta)
+        else:
+            if colour == Colour.White: #white maximizes
+                value = self.__whiteMin
+                move = board.move(*firstMove)
+                if (move.validMove):
+                    self.currentTurnSequence[depth] = firstMove                           
+                    value = max([value,self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)])  
+                    if value > alpha:
+                        self.pvTable[depth] = [firstMove] + self.pvTable[depth + 1]      
+                        alpha = value
+                    board.revertMove(move) 
+                    self.currentTurnSequence[depth] = []
+                self.followPV = False
+                for mov in self.pickMoves(board, colour, depth, None):
+                    if (mov == firstMove):
+                        continue
+                    self.nodes = self.nodes + 1 
+                    move = board.move(*mov)                            
+                    if (move.validMove):
+                        self.currentTurnSequence[depth] = mov                           
+                        valueNew = max([value,self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)])
+                        board.revertMove(move) 
+                        if self.__abortSearch: #partial results are discarded if the corresponding tree is not searched fully
+                            return value
+                        else:
+                            value = valueNew
+                        if value > alpha:
+                            self.pvTable[depth] = [mov] + self.pvTable[depth + 1]
+                            alpha = value 
+                                
+                        self.currentTurnSequence[depth] = []
+                        if alpha >= beta:
+                            return value
+            else:
+                value = self.__blackMax
+                move = board.move(*firstMove)
+                if (move.validMove):
+                    self.currentTurnSequence[depth] = firstMove                           
+                    value = min([value,self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)])
+                    if value < beta:
+                        self.pvTable[depth] = [firstMove] + self.pvTable[depth + 1]      
+                        beta = value 
+                    board.revertMove(move) 
+                    self.currentTurnSequence[depth] = []
+                self.followPV = False
+                for mov in self.pickMoves(board, colour, depth, None):
+                    if (mov == firstMove):
+                        continue
+                    self.nodes = self.nodes + 1 
+                    move = board.move(*mov)                           
+                    if (move.validMove):                       
+                        self.currentTurnSequence[depth] = mov
+                        valueNew = min([value,self.alphaBeta(board, not colour, depth + 1, maxDepth + self.getExtension(board, move, depth, maxDepth), alpha, beta)])
+                        board.revertMove(move) 
+                        if self.__abortSearch:
+                            return value
+                        else:
+                            value = valueNew
+                        if value < beta:
+                            self.pvTable[depth] = [mov] + self.pvTable[depth + 1]
+                            beta = value   
+                        self.currentTurnSequence[depth] = []
+                        if alpha >= beta:
+                            return value
+            return value
+
+    #Root search of the Multi-PV mode: searches the root moves in the given order and returns their lines
+    #[move, valuation, principal variation], sorted best first. Each move is searched with the valuation of the
+    #multiPV-th best line so far as bound, so that only the best multiPV valuations are exact. The lines share the
+    #transposition table, and the order of the previous iteration's lines
+    def alphaBeta_multiPV(self, board, colour, maxDepth, rootMoves, previousLines = []):
+        lines = []
+        previousPVs = {}
+        for line in previousLines:
+            previousPVs[tuple(line[0])] = line[2]
+        for rootMove in rootMoves:
+            self.nodes = self.nodes + 1
+            move = board.move(*rootMove)
+            if not move.validMove:
+                continue
+            self.currentTurnSequence[0] = rootMove
+            self.previousPV = previousPVs.get(tuple(rootMove), [])
+            self.followPV = True
+            if isinstance(move.pieceTaken,King):
+                self.pvTable[1] = []
+                value = self.__blackMax if colour == Colour.White else self.__whiteMin
+            elif colour == Colour.White:
+                alpha = lines[self.multiPV - 1][1] if len(lines) >= self.multiPV else self.__whiteMin
+                value = self.alphaBeta(board, not colour, 1, maxDepth + self.getExtension(board, move, 0, maxDepth), alpha, self.__blackMax)
+            else:
+                beta = lines[self.multiPV - 1][1] if len(lines) >= self.multiPV else self.__blackMax
+                value = self.alphaBeta(board, not colour, 1, maxDepth + self.getExtension(board, move, 0, maxDepth), self.__whiteMin, beta)
+            board.revertMove(move)
+            self.currentTurnSequence[0] = []
+            if self.__abortSearch: #partial results are discarded if the corresponding tree is not searched fully
+                break
+            lines.append([rootMove, value, [rootMove] + self.pvTable[1]])
+            lines.sort(key = lambda line: -line[1] if colour == Colour.White else line[1])
+        if lines != []:
+            self.transpositionTable.store(board.getHash(colour), lines[0][0])
+        return lines
+
+    #Prints the lines of the Multi-PV mode
+    def printMultiPVLines(self):
+        for i in range(len(self.multiPVLines)):
+            line = self.multiPVLines[i]
+            print(" -Line " + str(i + 1) + ": " + "%6d"%line[1] + "  " + ' '.join([getMoveName(m) for m in line[2]]))
+
+    #Searches with increasing depth until the time manager stops the search, or a mate within the searched depth is found.
+    #Without a time manager, timeLimit is used as fixed time per move. Returns None if colour has no legal move
+    def calculateMove_IterativeDeepening(self, board, colour, timeLimit, timeManager = None):
+        maxDepth = 0
+        startingMove = None
+        if timeManager == None:
+            timeManager = TimeManager(moveTime = timeLimit)
+        timeManager.startMove()
+        self.timeManager = timeManager
+        self.timeLimit = timeManager.hardLimit
+        self.__abortSearch = False
+        self.__iterativeDeepening = True
+        self.nodes = 0
+        self.completedDepth = 0
+        self.bestValue = None
+        self.pawnTable.resetStats()
+        self.transpositionTable.resetStats()
+        self.evalCache.resetStats()
+        self.searchStart = len(board.hashHistory) - 1
+        self.multiPVLines = [] #reset before the analysis cache is probed, so that a cached result has no lines of an earlier search
+        self.killers = []
+        legalMoves = board.generateMoveList(colour)
+        if legalMoves == []:
+            self.turnSequence = []
+            return None
+        cached = self.probeAnalysisCache(board, colour)
+        if cached != None:
+            if (self.depthLimit != None) and (cached[0] >= self.depthLimit):
+                return self.useCachedAnalysis(cached)
+            startingMove = cached[2][0]
+        rootMoves = legalMoves if self.multiPV > 1 else []
+        lines = []
+        val = None
+        self.turnSequence = [[-1,-1,-1,-1]]*(1 + self.quiescenceLimit)
+        if startingMove != None:
+            self.turnSequence = [startingMove] + self.turnSequence[1:]
+        board.allowIllegalMoves = True
+        while not self.__abortSearch: #Continually increase depth while the time manager and the limits allow it
+            maxDepth = maxDepth + 1
+            self.searchDepth = maxDepth
+            self.currentTurnSequence = [[]]*(maxDepth+self.quiescenceLimit+self.extensionLimit)
+            self.captures = [None]*(maxDepth + self.extensionLimit)
+            self.killers = self.killers + [[] for i in range(maxDepth + self.extensionLimit - len(self.killers))]
+            self.pvTable = [[] for i in range(maxDepth + self.quiescenceLimit + self.extensionLimit + 1)]
+            self.previousPV = [mov for mov in self.turnSequence if not -1 in mov]
+            self.followPV = True
+            if rootMoves != []: #Multi-PV mode
+                lines = self.alphaBeta_multiPV(board, colour, maxDepth, rootMoves, lines)
+                if (not self.__abortSearch) or (self.multiPVLines == []):
+                    self.multiPVLines = lines[:self.multiPV]
+                    rootMoves = [line[0] for line in lines] + [mov for mov in rootMoves if not mov in [line[0] for line in lines]] #best lines first in the next iteration
+                if self.multiPVLines != []:
+                    self.setPrincipalVariation(self.multiPVLines[0][2], maxDepth)
+                    val = self.multiPVLines[0][1]
+            else:
+                val = self.alphaBeta_depth0(board,colour,0,maxDepth,self.__whiteMin,self.__blackMax, startingMove)
+                #the line of an aborted iteration is only used if a new best move was searched fully
+                if (self.pvTable[0] != []) and ((not self.__abortSearch) or (self.pvTable[0][0] != startingMove)):
+                    self.setPrincipalVariation(self.pvTable[0], maxDepth)
+            startingMove = self.turnSequence[0]
+            if not self.__abortSearch:
+                self.completedDepth = maxDepth
+                self.bestValue = val
+                timeManager.iterationFinished(startingMove, val if colour == Colour.White else -val)
+                if (not timeManager.continueSearch()) or ((self.depthLimit != None) and (maxDepth >= self.depthLimit)):
+                    break
+                if abs(val) >= self.__blackMax - maxDepth: #a mate within the searched depth: deeper iterations cannot change the result
+                    break
+        board.allowIllegalMoves = False
+        if self.verbose:
+            print("\n"+" -Best Valuation @Depth "+str(maxDepth)+" : "+ str(val))
+            self.printMultiPVLines()
+        if startingMove == [-1,-1,-1,-1]: 
+            if self.verbose:
+                print(" -Checkmate within "+str(maxDepth)+" turns.")
+            startingMove = legalMoves[0]
+        self.storeAnalysis(board, colour, startingMove)
+        return startingMove
+
+    #Iterative deepening search under a game clock with the given remaining time and increment (seconds)
+    def calculateMove_Clock(self, board, colour, remaining, increment = 0, movesToGo = None):
+        timeManager = TimeManager(remaining = remaining, increment = increment, movesToGo = movesToGo)
+        return self.calculateMove_IterativeDeepening(board, colour, None, timeManager)
+
+    #Searches to the given depth; returns None if colour has no legal move
+    def calculateMove_FixedDepth(self, board, colour, maxDepth):
+        self.__abortSearch = False
+        self.__iterativeDeepening = False
+        self.nodes = 0
+        self.pawnTable.resetStats()
+        self.transpositionTable.resetStats()
+        self.evalCache.resetStats()
+        self.searchStart = len(board.hashHistory) - 1
+        self.multiPVLines = []
+        self.killers = [[] for i in range(maxDepth + self.extensionLimit)]
+        legalMoves = board.generateMoveList(colour)
+        if legalMoves == []:
+            self.completedDepth = 0
+            self.bestValue = None
+            self.turnSequence = []
+            return None
+        cached = self.probeAnalysisCache(board, colour)
+        if (cached != None) and (cached[0] >= maxDepth):
+            return self.useCachedAnalysis(cached)
+        self.searchDepth = maxDepth
+        self.currentTurnSequence = [[]]*(maxDepth+self.quiescenceLimit+self.extensionLimit)
+        self.captures = [None]*(maxDepth + self.extensionLimit)
+        self.pvTable = [[] for i in range(maxDepth + self.quiescenceLimit + self.extensionLimit + 1)]
+        self.followPV = False
+        rootMoves = legalMoves if self.multiPV > 1 else []
+        board.allowIllegalMoves = True
+        if rootMoves != []:
+            self.multiPVLines = self.alphaBeta_multiPV(board, colour, maxDepth, rootMoves)[:self.multiPV]
+            self.followPV = False
+            val = self.multiPVLines[0][1]
+            self.setPrincipalVariation(self.multiPVLines[0][2], maxDepth)
+        else:
+            val = self.alphaBeta(board,colour,0,maxDepth,self.__whiteMin,self.__blackMax)
+            self.setPrincipalVariation(self.pvTable[0], maxDepth)
+        board.allowIllegalMoves = False
+        self.completedDepth = maxDepth
+        self.bestValue = val
+        if self.verbose:
+            print("\n"+" -Best Valuation @Depth "+str(maxDepth)+" : "+ str(val))
+            self.printMultiPVLines()
+        if self.turnSequence[0] == [-1,-1,-1,-1]: 
+            if self.verbose:
+                print(" -Checkmate within "+str(maxDepth)+" turns.")
+            self.turnSequence[0] = legalMoves[0]
+        self.storeAnalysis(board, colour, self.turnSequence[0])
+        return self.turnSequence[0]
+
+    #Sets turnSequence to the given principal variation, padded to the length of the search
+    def setPrincipalVariation(self, pv, maxDepth):
+        self.turnSequence = pv + [[-1,-1,-1,-1]]*max(maxDepth + self.quiescenceLimit - len(pv), 0)
+
+    #Returns the cached result [depth, score, pv] of the position if its best move is legal, else None
+    def probeAnalysisCache(self, board, colour):
+        if (self.analysisCache == None) or (self.multiPV > 1): #only the best line is cached
+            return None
+        cached = self.analysisCache.get(board.getHash(colour), self.quiescenceLimit, self.extensionLimit)
+        if (cached == None) or (cached[2] == []) or (not cached[2][0] in board.generateMoveList(colour)):
+            return None
+        return cached
+
+    #Takes over a cached result as result of the current search and returns its best move
+    def useCachedAnalysis(self, cached):
+        self.completedDepth = cached[0]
+        self.bestValue = cached[1]
+        self.turnSequence = [move for move in cached[2]]
+        if self.verbose:
+            print(" -Best Valuation @Depth "+str(cached[0])+" : "+ str(cached[1]) + " (analysis cache)")
+        return cached[2][0]
+
+    #Stores the result of the finished search in the analysis cache, unless it depends on random evaluation variations
+    def storeAnalysis(self, board, colour, move):
+        if (self.analysisCache == None) or self.randomness or (self.completedDepth == 0) or (len(move) < 4) or (-1 in move):
+            return
+        pv = []
+        for mov in self.turnSequence[:self.completedDepth]:
+            if (len(mov) < 4) or (-1 in mov):
+                break
+            pv.append(mov)
+        if (pv == []) or (pv[0] != move):
+            pv = [move]
+        self.analysisCache.store(board.getHash(colour), self.quiescenceLimit, self.extensionLimit, self.completedDepth, self.bestValue, pv)
+
+    #Aborts a running search (called from another thread); partial results are discarded as with a timeout
+    def stopSearch(self):
+        self.__abortSearch = True
+    
+    #Method used to print the current search progress,
+    #and to abort the search if the prescribed time limit is exceeded
+    def updateSearchProgress(self, alpha, beta):
+        if self.nodes % 1000 == 0:
+            if (self.__iterativeDeepening) and (self.timeManager.hardLimitReached() or ((self.nodeLimit != None) and (self.nodes >= self.nodeLimit))):
+                self.__abortSearch = True
+            if not self.verbose:
+                return
+            s = ''
+            i = 0
+            for move in self.currentTurnSequence:
+                if (move != []) and (move != [-1,-1,-1,-1]):
+                    s = s + getMoveName(move)
+                    if (i >= self.searchDepth - 1):
+                        s = s + "="
+                    else:
+                        s = s + "-"
+                else:
+                    s = s + "none=" 
+                i = i + 1
+            if (self.__iterativeDeepening):
+                time_diff = min(self.timeManager.elapsed(), self.timeManager.hardLimit)
+                print("\r"+" -CALC.. t-" + "%.1f"%round(self.timeManager.hardLimit - time_diff,1)+
+                      "sec, d="+str(self.searchDepth)+"+"+
+                      str(self.quiescenceLimit)+", n="+str(self.nodes)+", seq=["+s[:-1]+"]",end='')
+            else:
+                print('\r'+' -CALC.. n='+str(self.nodes) + ", seq=["+s[:-1]+"]",end='')
+
+#Searches on the opponent's time, i.e. while the game loop waits for input, in a background thread.
+#The pondered position results from the engine's move and the predicted reply (the second move of the searched sequence).
+#If the predicted position is reached, the running search is switched to the requested time limit (ponder hit)
+#and its finished iterations are reused. Otherwise it is stopped and discarded.
+#The ponder engine is set up like the game engine (seed, config and search settings) and shares its transposition table,
+#which the game engine does not use while the ponder search runs; it is kept across ponder searches until the game engine's tables change.
+class Ponderer:
+
+    def __init__(self):
+        self.engine = None
+        self.timeManager = None
+        self.thread = None
+        self.board = None
+        self.colour = None
+        self.positionKeys = [] #hashes of the positions from which the pondered position can still be reached, the last one being the pondered position
+        self.result = None
+
+    def isActive(self):
+        return self.thread != None
+
+    #Starts pondering the position after engineMove and predictedReply, with colour being the colour of the game engine.
+    #Returns false if no valid position to ponder results, or if the game ends there (no legal move, or a draw by rule).
+    def start(self, board, colour, engineMove, predictedReply, engine):
+        self.stop()
+        if (engineMove == None) or (predictedReply == None) or (-1 in engineMove) or (len(predictedReply) < 4) or (-1 in predictedReply):
+            return False
+        ponderBoard = copy.deepcopy(board)
+        ponderBoard.allowIllegalMoves = False
+        positionKeys = [ponderBoard.getHash(colour)]
+        move = ponderBoard.move(*engineMove)
+        if not move.validMove:
+            return False
+        positionKeys.append(ponderBoard.getHash(not colour))
+        move = ponderBoard.move(*predictedReply)
+        if (not move.validMove) or (move.pieceMoved.colour == colour):
+            return False
+        if (ponderBoard.generateMoveList(colour) == []) or ponderBoard.isThreefoldRepetition() or ponderBoard.isFiftyMoveRule(colour):
+            return False
+        positionKeys.append(ponderBoard.getHash(colour))
+        self.board = ponderBoard
+        self.colour = colour
+        self.positionKeys = positionKeys
+        self.result = None
+        self.setUpEngine(engine)
+        self.timeManager = TimeManager() #no time control until the ponder hit
+        self.thread = threading.Thread(target = self.__search, daemon = True)
+        self.thread.start()
+        return True
+
+    #Sets up the ponder engine with the settings of the game engine
+    def setUpEngine(self, engine):
+        if (self.engine == None) or (self.engine.transpositionTable is not engine.transpositionTable):
+            self.engine = Engine(engine.seed, engine.config)
+            self.engine.transpositionTable = engine.transpositionTable
+        elif self.engine.seed != engine.seed:
+            self.engine.setSeed(engine.seed)
+        for setting in ['randomness', 'rand_limit', 'randomMode', 'quiescenceLimit', 'extensionLimit', 'depthLimit', 'nodeLimit', 'multiPV', 'analysisCache']:
+            setattr(self.engine, setting, getattr(engine, setting))
+        self.engine.verbose = False
+
+    def __search(self):
+        self.result = self.engine.calculateMove_IterativeDeepening(self.board, self.colour, None, self.timeManager)
+
+    #Stops pondering if the given position can no longer lead to the pondered position
+    def update(self, board, colour):
+        if self.isActive() and (not board.getHash(colour) in self.positionKeys):
+            self.stop()
+
+    #Returns true if the pondered position is the given position
+    def isHit(self, board, colour):
+        return self.isActive() and (board.getHash(colour) == self.positionKeys[-1])
+
+    #Continues the ponder search with the given time limit and returns its move
+    def ponderHit(self, timeLimit):
+        self.engine.verbose = True
+        self.timeManager.ponderHit(moveTime = timeLimit)
+        self.thread.join()
+        self.thread = None
+        return self.result
+
+    #Stops the ponder search and discards its result
+    def stop(self):
+        if self.thread != None:
+            while self.thread.is_alive():
+                self.engine.stopSearch()
+                self.thread.join(0.01)
+            self.thread = None
+            self.result = None
+    
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Self-play training data of the chess engine, e.g. for tuning the evaluation
+- Worker processes play games with calculateMove_FixedDepth, starting with a few random plies for variety
+- Sampled positions are stored with the search score and the final result of their game as fixed-width binary records,
+  appended to a file that can be memory-mapped (see readRecords, loadRecords)
+- Run with: python -m chessengine.selfplay data.bin --games 100 --workers 4 --depth 2
+"""
+
+import time, random, struct, mmap, os, argparse, multiprocessing
+from .pieces import Colour
+from .board import ChessBoard
+from .search import Engine
+from .config import EngineConfig
+
+#File layout: a header (magic, version, record size), then records of recordSize bytes:
+#32 bytes of squares (4 bits per square in the order 8*x + y, low nibble first; 0: empty, else 1 + 2*piece.index + piece.colour),
+#the colour to move (uint8), the result of the game (int8: 1 white won, 0 draw, -1 black won),
+#the search score (int16, centipawns, white positive, clipped to +-scoreLimit), the ply of the position in its game (uint16) and 2 bytes padding.
+#Integers are stored in native byte order; a file of another byte order fails the version check
+fileMagic = b'PCSP'
+fileVersion = 1
+fileHeader = struct.Struct('=4sII')
+recordFormat = struct.Struct('=32sBbhH2x')
+recordSize = recordFormat.size
+scoreLimit = 32000
+
+#Returns the squares of the board packed into 32 bytes (see the file layout)
+def encodeSquares(board):
+    codes = bytearray(64)
+    for x in range(8):
+        for y in range(8):
+            piece = board.squares[x][y]
+            if piece != None:
+                codes[8*x + y] = 1 + 2*piece.index + piece.colour
+    return bytes([codes[2*i] | (codes[2*i + 1] << 4) for i in range(32)])
+
+#Returns the record of the position on the board with colour to move
+def encodeRecord(board, colour, score, result, ply):
+    return recordFormat.pack(encodeSquares(board), colour, result, max(-scoreLimit, min(scoreLimit, score)), ply)
+
+#Returns the record as [codes of the 64 squares (indexed 8*x + y), colour, result, score, ply]
+def decodeRecord(data):
+    squares, colour, result, score, ply = recordFormat.unpack(data)
+    codes = []
+    for byte in squares:
+        codes.append(byte & 15)
+        codes.append(byte >> 4)
+    return [codes, colour, result, score, ply]
+
+#Checks the header of the file and returns the number of records; raises ValueError if it is no self-play file
+def checkFile(file):
+    file.seek(0, os.SEEK_END)
+    length = file.tell()
+    file.seek(0)
+    if length < fileHeader.size:
+        raise ValueError("Not a self-play file: " + file.name)
+    magic, version, size = fileHeader.unpack(file.read(fileHeader.size))
+    if (magic != fileMagic) or (version != fileVersion) or (size != recordSize) or ((length - fileHeader.size) % recordSize != 0):
+        raise ValueError("Not a self-play file of version " + str(fileVersion) + ": " + file.name)
+    return (length - fileHeader.size) // recordSize
+
+#Opens the file for appending records; writes the header if the file is new or empty
+def openForAppend(path):
+    file = open(path, 'ab+')
+    if file.tell() == 0:
+        file.write(fileHeader.pack(fileMagic, fileVersion, recordSize))
+        file.flush()
+    else:
+        checkFile(file)
+        file.seek(0, os.SEEK_END)
+    return file
+
+#Yields the records of the file (see decodeRecord), reading them from a memory mapping
+def readRecords(path):
+    with open(path, 'rb') as file:
+        count = checkFile(file)
+        if count == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_READ) as mapping:
+            for i in range(count):
+                yield decodeRecord(mapping[fileHeader.size + i*recordSize:fileHeader.size + (i + 1)*recordSize])
+
+#Maps the records of the file as NumPy structured array with the fields squares (32 bytes), colour, result, score and ply.
+#Requires NumPy (imported on demand, as the engine itself does not depend on it)
+def loadRecords(path):
+    import numpy
+    with open(path, 'rb') as file:
+        count = checkFile(file)
+    dtype = numpy.dtype([('squares', numpy.uint8, 32), ('colour', numpy.uint8), ('result', numpy.int8), ('score', numpy.int16),
+                         ('ply', numpy.uint16), ('padding', numpy.uint8, 2)])
+    if count == 0:
+        return numpy.zeros(0, dtype = dtype)
+    return numpy.memmap(path, dtype = dtype, mode = 'r', offset = fileHeader.size, shape = (count,))
+
+#Unpacks the squares of records (e.g. of loadRecords) into an (N, 64) array of square codes, indexed 8*x + y
+def unpackSquares(squares):
+    import numpy
+    codes = numpy.empty((len(squares), 64), dtype = numpy.uint8)
+    codes[:, 0::2] = squares & 15
+    codes[:, 1::2] = squares >> 4
+    return codes
+
+#Settings of a self-play run, passed to the worker processes
+class SelfPlaySettings:
+
+    depth = 2 #search depth of every move
+    randomPlies = 8 #plies of random legal moves at the start of each game
+    sampleRate = 0.25 #share of the positions after the random plies that is recorded
+    maxPlies = 300 #games reaching this number of plies are scored as draw
+    skipChecks = True #positions with the side to move in check are not recorded (their score depends on forced lines)
+
+    def __init__(self, **settings):
+        for name in settings:
+            if (not hasattr(SelfPlaySettings, name)) or name.startswith('_'):
+                raise ValueError("Unknown self-play setting: " + name)
+            setattr(self, name, settings[name])
+
+workerEngine = None
+workerSettings = None
+
+#Sets up the engine of a worker process
+def initWorker(config, settings):
+    global workerEngine, workerSettings
+    workerEngine = Engine(None, config)
+    workerEngine.verbose = False
+    workerSettings = settings
+
+#Plays one game of self-play with the worker's engine; the game's randomness (opening plies, sampling) follows from seed.
+#Returns [records (bytes), number of plies, result]
+def playGame(seed):
+    engine, settings = workerEngine, workerSettings
+    rng = random.Random(seed)
+    engine.setSeed(seed)
+    engine.transpositionTable.clear() #the move order, and thereby the chosen moves, only depends on the game
+    board = ChessBoard()
+    colour = Colour.White
+    samples = []
+    result = 0
+    for ply in range(settings.maxPlies):
+        moves = board.generateMoveList(colour)
+        if moves == []:
+            if board.isColourCheck(colour):
+                result = -1 if colour == Colour.White else 1
+            break
+        if board.isThreefoldRepetition() or board.isFiftyMoveRule(colour):
+            break
+        if ply < settings.randomPlies:
+            move = rng.choice(moves)
+        else:
+            move = engine.calculateMove_FixedDepth(board, colour, settings.depth)
+            if (rng.random() < settings.sampleRate) and not (settings.skipChecks and board.isColourCheck(colour)):
+                samples.append([encodeSquares(board), colour, engine.bestValue, ply])
+        board.move(*move)
+        colour = not colour
+    else:
+        ply = settings.maxPlies
+    records = b''.join([recordFormat.pack(squares, side, result, max(-scoreLimit, min(scoreLimit, score)), samplePly) for squares, side, score, samplePly in samples])
+    return [records, ply, result]
+
+#Plays the games in worker processes and appends their sampled positions to the file, one game at a time.
+#Game i is seeded with seed + i, so that runs with the same settings, seed and engine config give the same records (in the order the games finish).
+#Reports the progress every reportInterval seconds (None: silent); returns [games, positions, seconds]
+def generate(path, games, workers = 2, seed = 0, config = None, settings = None, reportInterval = 10):
+    config = EngineConfig(randomness = False) if config == None else config
+    settings = SelfPlaySettings() if settings == None else settings
+    start = time.time()
+    lastReport = start
+    positions = 0
+    plies = 0
+    outcomes = {1: 0, 0: 0, -1: 0}
+    file = openForAppend(path)
+    try:
+        with multiprocessing.Pool(workers, initWorker, (config, settings)) as pool:
+            for finished, [records, gamePlies, result] in enumerate(pool.imap_unordered(playGame, range(seed, seed + games)), 1):
+                file.write(records)
+                file.flush()
+                positions = positions + len(records) // recordSize
+                plies = plies + gamePlies
+                outcomes[result] = outcomes[result] + 1
+                if (reportInterval != None) and ((time.time() - lastReport >= reportInterval) or (finished == games)):
+                    lastReport = time.time()
+                    seconds = lastReport - start
+                    print(str(finished) + "/" + str(games) + " games (+" + str(outcomes[1]) + " =" + str(outcomes[0]) + " -" + str(outcomes[-1]) + "), " +
+                          str(positions) + " positions, " + "%.1f"%(positions / max(seconds, 0.001)) + " positions/s, " +
+                          "%.1f"%(plies / max(seconds, 0.001)) + " plies/s", flush = True)
+    finally:
+        file.close()
+    return [games, positions, time.time() - start]
+
+def main():
+    parser = argparse.ArgumentParser(description = "Self-play training data of the chess engine")
+    parser.add_argument('output', help = "file the records are appended to")
+    parser.add_argument('--games', type = int, default = 100)
+    parser.add_argument('--workers', type = int, default = multiprocessing.cpu_count())
+    parser.add_argument('--depth', type = int, default = SelfPlaySettings.depth, help = "search depth of every move")
+    parser.add_argument('--random-plies', type = int, default = SelfPlaySettings.randomPlies, help = "random plies at the start of each game")
+    parser.add_argument('--sample-rate', type = float, default = SelfPlaySettings.sampleRate, help = "share of the positions that is recorded")
+    parser.add_argument('--max-plies', type = int, default = SelfPlaySettings.maxPlies, help = "games reaching this number of plies are scored as draw")
+    parser.add_argument('--seed', type = int, default = 0, help = "seed of the first game (game i: seed + i)")
+    parser.add_argument('--hash', type = float, default = EngineConfig.hashSize, help = "memory budget of each worker's hash tables in MB")
+    args = parser.parse_args()
+    try:
+        config = EngineConfig(hashSize = args.hash, randomness = False)
+        settings = SelfPlaySettings(depth = args.depth, randomPlies = args.random_plies, sampleRate = args.sample_rate, maxPlies = args.max_plies)
+        generate(args.output, args.games, args.workers, args.seed, config, settings)
+    except ValueError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
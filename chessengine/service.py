@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Local HTTP/JSON analysis service of the chess engine
+- A pool of worker processes, each keeping a warm Engine (with its pawn hash table and evaluation cache) across requests
+- Requests wait in a bounded queue until a worker is idle; time, depth and node limits per request
+- Run with: python -m chessengine.service --port 8080 --workers 2
+
+POST /analyse   {"fen": "...", "movetime": 500, "depth": 6, "nodes": 100000, "multipv": 3} (all fields optional)
+GET  /metrics   request counts, latency percentiles and memory of the engines' hash tables
+GET  /health
+"""
+
+import time, json, threading, collections, multiprocessing, queue, argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from .board import ChessBoard, getMoveName
+from .search import Engine, TimeManager
+from .config import EngineConfig
+from .analysiscache import AnalysisCache
+
+startFEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+#Raised by EnginePool.analyse if the request queue is full
+class ServiceBusy(Exception):
+    pass
+
+#Checks a request (decoded JSON) and returns it with the default limits applied; raises ValueError if it is invalid.
+#Every search is limited to maxMoveTime: depth and node limits can only end it earlier (defaultMoveTime if neither is given)
+def parseRequest(request, defaultMoveTime = 1000, maxMoveTime = 60000):
+    if not isinstance(request, dict):
+        raise ValueError("Request must be a JSON object")
+    fen = request.get('fen', startFEN)
+    if not isinstance(fen, str):
+        raise ValueError("'fen' must be a string")
+    limits = {}
+    for key in ['movetime', 'depth', 'nodes', 'multipv']:
+        value = request.get(key)
+        if value == None:
+            continue
+        if isinstance(value, bool) or (not isinstance(value, int)) or (value <= 0):
+            raise ValueError("'" + key + "' must be a positive integer")
+        limits[key] = value
+    multiPV = limits.pop('multipv', 1)
+    if limits == {}:
+        limits['movetime'] = defaultMoveTime
+    limits['movetime'] = min(limits.get('movetime', maxMoveTime), maxMoveTime)
+    return {'fen': fen, 'movetime': limits.get('movetime'), 'depth': limits.get('depth'), 'nodes': limits.get('nodes'), 'multipv': multiPV}
+
+#Analyses a parsed request on the given engine and board (both are reused across requests).
+#Scores are given in centipawns from white's perspective, as by the engine's evaluation
+def analysePosition(engine, board, request):
+    colour = board.setFEN(request['fen'])
+    fen = board.getFEN(colour)
+    if board.generateMoveList(colour) == []:
+        return {'fen': fen, 'bestmove': None, 'score': None, 'depth': 0, 'nodes': 0, 'pv': [], 'searchTime': 0.0,
+                'result': 'checkmate' if board.isColourCheck(colour) else 'stalemate'}
+    engine.depthLimit = request['depth']
+    engine.nodeLimit = request['nodes']
+    engine.multiPV = request['multipv']
+    if request['movetime'] != None:
+        timeManager = TimeManager(moveTime = request['movetime'] / 1000)
+    else:
+        timeManager = TimeManager()
+    start = time.time()
+    move = engine.calculateMove_IterativeDeepening(board, colour, None, timeManager)
+    searchTime = time.time() - start
+    pv = []
+    for mov in engine.turnSequence[:max(engine.completedDepth, 1)]:
+        if (len(mov) < 4) or (-1 in mov):
+            break
+        pv.append(getMoveName(mov))
+    lines = []
+    for line in engine.multiPVLines:
+        lines.append({'move': getMoveName(line[0]), 'score': line[1], 'pv': [getMoveName(m) for m in line[2]]})
+    return {'fen': fen, 'bestmove': getMoveName(move), 'score': engine.bestValue,
+            'depth': engine.completedDepth, 'nodes': engine.nodes, 'pv': pv, 'searchTime': round(1000 * searchTime, 1),
+            'cached': (engine.analysisCache != None) and (engine.nodes == 0), 'lines': lines}
+
+#Entry point of a worker process: analyses the requests received on the connection with one persistent engine,
+#until None is received. Workers may share one analysis cache file,
+#and may start from a transposition table file (mapped, so that the workers share its pages until they modify them).
+#The memory of the engine's hash tables (bytes) is sent once the engine is set up
+def analysisWorker(connection, seed, config, cachePath = None, cacheSize = 100000, tablePath = None):
+    engine = Engine(seed, config)
+    engine.verbose = False
+    if tablePath != None:
+        engine.transpositionTable.load(tablePath)
+    if cachePath != None:
+        engine.analysisCache = AnalysisCache(cachePath, cacheSize)
+    connection.send(engine.getMemoryUsage())
+    board = ChessBoard()
+    while True:
+        request = connection.recv()
+        if request == None:
+            break
+        try:
+            connection.send(analysePosition(engine, board, request))
+        except ValueError as e:
+            connection.send({'error': str(e)})
+    connection.close()
+
+#Pool of warm worker processes, whose engines are set up from config (None: the default EngineConfig without randomness).
+#analyse() may be called from several threads: at most one request per worker runs at a time, up to maxQueue further requests wait for an idle worker.
+class EnginePool:
+
+    maxQueue = 16
+    latencyWindow = 1000 #number of recent requests the latency percentiles are computed from
+
+    def __init__(self, size = 2, seed = None, config = None, cachePath = None, cacheSize = 100000, tablePath = None):
+        self.size = size
+        self.seed = seed
+        self.config = EngineConfig(randomness = False) if config == None else config
+        self.cachePath = cachePath
+        self.cacheSize = cacheSize
+        self.tablePath = tablePath
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.pending = 0 #requests queued or running
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.cacheHits = 0
+        self.latencies = collections.deque(maxlen = self.latencyWindow) #[total, queue wait, search] in ms
+        self.nodes = collections.deque(maxlen = self.latencyWindow)
+        self.memory = {} #worker index: memory of its engine's hash tables in bytes
+        self.workers = []
+        for i in range(size):
+            self.idle.put(self.__startWorker(i))
+
+    def __startWorker(self, i):
+        connection, workerConnection = multiprocessing.Pipe()
+        seed = None if self.seed == None else self.seed + i
+        process = multiprocessing.Process(target = analysisWorker, args = (workerConnection, seed, self.config, self.cachePath, self.cacheSize, self.tablePath), daemon = True)
+        process.start()
+        workerConnection.close()
+        self.memory[i] = connection.recv()
+        worker = [i, process, connection]
+        self.workers.append(worker)
+        return worker
+
+    #Analyses a request (see parseRequest) on the next idle worker and returns the result;
+    #raises ServiceBusy if too many requests are waiting and ValueError for invalid positions
+    def analyse(self, request):
+        with self.lock:
+            if self.pending >= self.size + self.maxQueue:
+                self.rejected = self.rejected + 1
+                raise ServiceBusy("All " + str(self.size) + " workers busy and " + str(self.maxQueue) + " requests queued")
+            self.pending = self.pending + 1
+        queued = time.time()
+        worker = self.idle.get()
+        started = time.time()
+        try:
+            worker[2].send(request)
+            result = worker[2].recv()
+        except (EOFError, OSError): #the worker died, replace it
+            worker[1].join(1)
+            self.workers.remove(worker)
+            worker = self.__startWorker(worker[0])
+            result = {'error': 'Worker process failed'}
+        finally:
+            self.idle.put(worker)
+            finished = time.time()
+            with self.lock:
+                self.pending = self.pending - 1
+        with self.lock:
+            self.requests = self.requests + 1
+            if 'error' in result:
+                self.errors = self.errors + 1
+            else:
+                self.latencies.append([1000 * (finished - queued), 1000 * (started - queued), result['searchTime']])
+                if result.get('cached'):
+                    self.cacheHits = self.cacheHits + 1
+                self.nodes.append(result['nodes'])
+        if 'error' in result:
+            raise ValueError(result['error'])
+        result['queueTime'] = round(1000 * (started - queued), 1)
+        return result
+
+    #Returns request counts and latency percentiles (ms) of the recent requests
+    def getMetrics(self):
+        with self.lock:
+            latencies = list(self.latencies)
+            nodes = list(self.nodes)
+            metrics = {'workers': self.size, 'busy': self.size - self.idle.qsize(), 'queued': max(self.pending - self.size, 0),
+                       'requests': self.requests, 'rejected': self.rejected, 'errors': self.errors, 'cacheHits': self.cacheHits,
+                       'memoryMB': {'perWorker': round(max(self.memory.values(), default = 0) / 2**20, 1), 'total': round(sum(self.memory.values()) / 2**20, 1)}}
+        for i, name in [[0, 'latency'], [1, 'queueTime'], [2, 'searchTime']]:
+            values = sorted([latency[i] for latency in latencies])
+            if values == []:
+                metrics[name] = None
+                continue
+            metrics[name] = {'p50': round(values[len(values) // 2], 1), 'p95': round(values[min(int(0.95 * len(values)), len(values) - 1)], 1),
+                             'p99': round(values[min(int(0.99 * len(values)), len(values) - 1)], 1), 'max': round(values[-1], 1)}
+        searchTime = sum([latency[2] for latency in latencies])
+        metrics['nodesPerSecond'] = int(1000 * sum(nodes) / searchTime) if searchTime > 0 else None
+        return metrics
+
+    #Stops the worker processes
+    def close(self):
+        for worker in self.workers:
+            try:
+                worker[2].send(None)
+            except OSError:
+                pass
+        for worker in self.workers:
+            worker[1].join(5)
+            if worker[1].is_alive():
+                worker[1].terminate()
+        self.workers = []
+
+class AnalysisRequestHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.sendJSON(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self.sendJSON(200, self.server.pool.getMetrics())
+        else:
+            self.sendJSON(404, {'error': 'Unknown path ' + self.path})
+
+    def do_POST(self):
+        if self.path != '/analyse':
+            self.sendJSON(404, {'error': 'Unknown path ' + self.path})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = parseRequest(json.loads(self.rfile.read(length) or b'{}'), self.server.defaultMoveTime, self.server.maxMoveTime)
+            self.sendJSON(200, self.server.pool.analyse(request))
+        except ServiceBusy as e:
+            self.sendJSON(503, {'error': str(e)})
+        except ValueError as e: #includes invalid JSON
+            self.sendJSON(400, {'error': str(e)})
+
+    def sendJSON(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            BaseHTTPRequestHandler.log_message(self, format, *args)
+
+#HTTP server answering each connection in its own thread, with the analysis delegated to the engine pool.
+#Requests without limits are searched for defaultMoveTime ms; every search is capped at maxMoveTime ms, whatever its depth or node limit
+class AnalysisServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+    defaultMoveTime = 1000
+    maxMoveTime = 60000
+
+    def __init__(self, address, pool, verbose = False):
+        ThreadingHTTPServer.__init__(self, address, AnalysisRequestHandler)
+        self.pool = pool
+        self.verbose = verbose
+
+def main():
+    parser = argparse.ArgumentParser(description = "Local HTTP/JSON analysis service of the chess engine")
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--port', type = int, default = 8080, help = "0: any free port")
+    parser.add_argument('--workers', type = int, default = 2)
+    parser.add_argument('--queue', type = int, default = EnginePool.maxQueue, help = "max. number of requests waiting for a worker")
+    parser.add_argument('--seed', type = int, default = None)
+    parser.add_argument('--randomness', action = 'store_true', help = "apply the engine's random evaluation variations")
+    parser.add_argument('--hash', type = float, default = EngineConfig.hashSize, help = "memory budget of each worker's hash tables in MB")
+    parser.add_argument('--cache', default = None, help = "SQLite file of the persistent analysis cache")
+    parser.add_argument('--cache-size', type = int, default = 100000, help = "max. number of positions in the analysis cache")
+    parser.add_argument('--tt', default = None, help = "transposition table file the workers start from (see 'engine_tt save')")
+    parser.add_argument('--verbose', action = 'store_true', help = "log every request")
+    args = parser.parse_args()
+    try:
+        config = EngineConfig(hashSize = args.hash, randomness = args.randomness)
+    except ValueError as e:
+        parser.error(str(e))
+    pool = EnginePool(args.workers, args.seed, config, args.cache, args.cache_size, args.tt)
+    pool.maxQueue = args.queue
+    server = AnalysisServer((args.host, args.port), pool, args.verbose)
+    print("Analysis service on http://" + args.host + ":" + str(server.server_address[1]) + " with " + str(args.workers) + " workers (" +
+          "%.1f"%(config.getMemoryFootprint() / 2**20) + " MB hash tables each)", flush = True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        pool.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Transposition table of the chess engine, storing the best move found for each position,
+which the search tries first when it reaches the position again.
+Tables can be saved to a binary file and memory-mapped when loaded, so that search work is kept across runs
+"""
+
+import array, mmap, os, struct
+from .pieces import Colour
+from .board import ChessBoard, parseMoveName
+
+#Direct-mapped table: the lower bits of the position hash select the slot, the upper 32 bits are kept to verify the entry.
+#Moves are packed into 12 bits (3 bits per coordinate: xOrig, yOrig, xDest, yDest), and the index of a promotion piece above them;
+#0 marks an empty slot, as a1a1 is no move.
+#An entry takes 6 bytes; moves are only hints for the move ordering, so that hash collisions do not affect the result.
+class TranspositionTable:
+
+    fileMagic = b'PCTT'
+    fileVersion = 1
+    fileHeader = struct.Struct('=4sII') #magic, version, size (native byte order; a file of another byte order fails the version check)
+    entryBytes = 6
+
+    def __init__(self, size):
+        if size & (size - 1) != 0:
+            raise ValueError("Transposition table size must be a power of 2")
+        self.size = size
+        self.checks = array.array('I', [0])*size
+        self.moves = array.array('H', [0])*size
+        self.mapping = None #file mapping backing checks and moves, if loaded from a file
+        self.probes = 0
+        self.hits = 0
+
+    #Returns the stored move [xOrig, yOrig, xDest, yDest(, promotion)] of the position with the given hash, or None
+    def getMove(self, key):
+        self.probes = self.probes + 1
+        i = key & (self.size - 1)
+        packed = self.moves[i]
+        if (packed == 0) or (self.checks[i] != key >> 32):
+            return None
+        self.hits = self.hits + 1
+        if packed >> 12:
+            return [(packed >> 9) & 7, (packed >> 6) & 7, (packed >> 3) & 7, packed & 7, packed >> 12]
+        return [packed >> 9, (packed >> 6) & 7, (packed >> 3) & 7, packed & 7]
+
+    def store(self, key, move):
+        i = key & (self.size - 1)
+        self.checks[i] = key >> 32
+        self.moves[i] = (move[0] << 9) | (move[1] << 6) | (move[2] << 3) | move[3] | ((move[4] << 12) if len(move) > 4 else 0)
+
+    def clear(self):
+        self.checks = array.array('I', [0])*self.size
+        self.moves = array.array('H', [0])*self.size
+        self.closeMapping()
+
+    def resetStats(self):
+        self.probes = 0
+        self.hits = 0
+
+    def getHitRate(self):
+        if self.probes == 0:
+            return 0
+        return self.hits / self.probes
+
+    #Returns the share of occupied slots
+    def getUsage(self):
+        return (self.size - self.moves.tolist().count(0)) / self.size
+
+    #Returns the memory of the table in bytes
+    def getMemoryUsage(self):
+        return self.size * self.entryBytes
+
+    #Writes the table to the file (via a temporary file, so that a table mapped from the same file remains valid)
+    def save(self, path):
+        temporaryPath = path + '.tmp'
+        with open(temporaryPath, 'wb') as file:
+            file.write(self.fileHeader.pack(self.fileMagic, self.fileVersion, self.size))
+            file.write(self.checks)
+            file.write(self.moves)
+        os.replace(temporaryPath, path)
+
+    #Replaces the table by the one stored in the file. The file is memory-mapped (copy on write),
+    #i.e. entries are only read from disk when probed, and changes are not written back until the table is saved
+    def load(self, path):
+        with open(path, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+        if len(mapping) < self.fileHeader.size:
+            mapping.close()
+            raise ValueError("Not a transposition table file: " + path)
+        magic, version, size = self.fileHeader.unpack_from(mapping, 0)
+        if (magic != self.fileMagic) or (version != self.fileVersion) or (size & (size - 1) != 0) or (len(mapping) != self.fileHeader.size + 6*size):
+            mapping.close()
+            raise ValueError("Not a transposition table file of version " + str(self.fileVersion) + ": " + path)
+        self.closeMapping()
+        view = memoryview(mapping)
+        self.size = size
+        self.checks = view[self.fileHeader.size:self.fileHeader.size + 4*size].cast('I')
+        self.moves = view[self.fileHeader.size + 4*size:].cast('H')
+        self.mapping = mapping
+
+    def closeMapping(self):
+        if self.mapping != None:
+            mapping = self.mapping
+            self.mapping = None
+            if not isinstance(self.checks, array.array):
+                self.checks = array.array('I', self.checks)
+                self.moves = array.array('H', self.moves)
+            mapping.close()
+
+    #Fills empty slots with the moves played in previous games, given as lists of moves [xOrig, yOrig, xDest, yDest(, promotion)]
+    #from the starting position. Games are replayed until the first illegal move. Returns the number of stored positions
+    def prewarm(self, games):
+        stored = 0
+        board = ChessBoard()
+        for game in games:
+            board.resetBoard()
+            colour = Colour.White
+            for mov in game:
+                key = board.getHash(colour)
+                move = board.move(*mov)
+                if (not move.validMove) or (move.pieceMoved.colour != colour):
+                    break
+                if self.moves[key & (self.size - 1)] == 0:
+                    self.store(key, mov)
+                    stored = stored + 1
+                colour = not colour
+        return stored
+
+#Reads games from a text file with one game per line, as moves in coordinate notation (e.g. "e2e4 e7e5 g1f3", promotions as "e7e8q")
+def readGames(path):
+    games = []
+    with open(path) as file:
+        for line in file:
+            game = []
+            for name in line.split():
+                move = parseMoveName(name)
+                if move == None:
+                    break
+                game.append(move)
+            if game != []:
+                games.append(game)
+    return games
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Texel tuning of the evaluation: piece values and middlegame/endgame scoreboards are fitted to the results of labelled positions
+(e.g. self-play records, see chessengine.selfplay), minimising the squared error between the result and the win probability
+predicted from the evaluation by a logistic function. The tuned parameters are written to a parameter file,
+which the engine applies when its tables are built (see chessengine.evaluation.loadParameters).
+Requires NumPy.
+- Run with: python -m chessengine.tuner data.bin --epochs 300 --output chessengine/parameters.json
+"""
+
+import time, argparse
+import numpy
+from .pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from .evaluation import PieceSquareTables, saveParameters, getParameterPath
+from .board import loadTables
+from .search import Engine
+from .config import EngineConfig
+from .selfplay import loadRecords, unpackSquares
+
+pieceTypes = [Pawn, Knight, Bishop, Rook, Queen, King]
+
+#The evaluation is linear in the parameters: every piece adds its value and its scoreboard entry (middlegame resp. endgame),
+#signed by its colour, and the two sums are interpolated by the game phase. The positions are therefore kept as the scoreboard
+#entries of their pieces (index 64*piece.index + 8*row + column, in the orientation of the piece classes' scoreBoard),
+#which are gathered to evaluate all positions and scattered (bincount) to compute the gradient, one full pass at a time.
+#Pawn structure terms are not tuned; they are added as a constant per position.
+class TexelTuner:
+
+    entries = 6*64
+    padding = 6*64 #index of the empty piece slots (an extra entry, always 0)
+    positionChunkSize = 65536 #positions per chunk when computing the pawn structure scores
+
+    #codes: (N, 64) square codes (see chessengine.selfplay), results: (N,) 1 white won, 0 draw, -1 black won
+    def __init__(self, codes, results):
+        codes = numpy.asarray(codes, dtype = numpy.uint8)
+        order = numpy.argsort(codes == 0, axis = 1, kind = 'stable')[:, :32] #occupied squares first
+        pieces = numpy.take_along_axis(codes, order, axis = 1).astype(numpy.int32) - 1
+        occupied = pieces >= 0
+        colours = pieces & 1
+        types = pieces >> 1
+        x = order >> 3
+        y = order & 7
+        row = numpy.where(colours == 0, 7 - y, y)
+        self.indices = numpy.where(occupied, 64*types + 8*row + x, self.padding).astype(numpy.int32)
+        self.signs = numpy.where(occupied, 1 - 2*colours, 0).astype(numpy.float32)
+        phases = numpy.array([pieceType.phase for pieceType in pieceTypes], dtype = numpy.float32)
+        phase = numpy.minimum(numpy.where(occupied, phases[types], 0).sum(axis = 1), PieceSquareTables.maxPhase)
+        self.middlegameWeights = phase / PieceSquareTables.maxPhase
+        self.pawnScores = self.getPawnScores(codes)
+        self.targets = (numpy.asarray(results, dtype = numpy.float32) + 1) / 2
+        self.scalingConstant = 1.0
+
+    #Returns the interpolated pawn structure scores of the positions
+    def getPawnScores(self, codes):
+        engine = Engine(None, EngineConfig(randomness = False))
+        scores = numpy.empty(len(codes), dtype = numpy.float32)
+        rows = numpy.arange(self.positionChunkSize)
+        squares = numpy.arange(64)
+        for start in range(0, len(codes), self.positionChunkSize):
+            chunk = codes[start:start + self.positionChunkSize]
+            occupancy = numpy.zeros((len(chunk), 13, 64), dtype = numpy.int8) #plane 0 collects the empty squares
+            occupancy[rows[:len(chunk), None], chunk, squares] = 1
+            pawnScores = engine.evaluatePawnStructureBatch(occupancy[:, 1:])
+            weights = self.middlegameWeights[start:start + self.positionChunkSize]
+            scores[start:start + self.positionChunkSize] = pawnScores[:, 0] * weights + pawnScores[:, 1] * (1 - weights)
+        return scores
+
+    #Returns the current parameters of the piece classes as [values (6), middlegame entries (384), endgame entries (384)]
+    def getParameters(self):
+        values = numpy.array([pieceType.value for pieceType in pieceTypes], dtype = numpy.float64)
+        middlegame = numpy.array([pieceType.scoreBoard for pieceType in pieceTypes], dtype = numpy.float64).reshape(self.entries)
+        endgame = numpy.array([pieceType.scoreBoardEndgame for pieceType in pieceTypes], dtype = numpy.float64).reshape(self.entries)
+        return [values, middlegame, endgame]
+
+    #Sets the parameters, rounded to integers, on the piece classes
+    def setParameters(self, parameters):
+        values, middlegame, endgame = parameters
+        for pieceType in pieceTypes:
+            pieceType.value = int(round(values[pieceType.index]))
+            pieceType.scoreBoard = numpy.rint(middlegame.reshape(6, 8, 8)[pieceType.index]).astype(int).tolist()
+            pieceType.scoreBoardEndgame = numpy.rint(endgame.reshape(6, 8, 8)[pieceType.index]).astype(int).tolist()
+
+    #Returns the evaluations (white positive) of all positions
+    def evaluate(self, parameters):
+        values, middlegame, endgame = parameters
+        middlegame = numpy.append(middlegame + numpy.repeat(values, 64), 0).astype(numpy.float32)
+        endgame = numpy.append(endgame + numpy.repeat(values, 64), 0).astype(numpy.float32)
+        weights = self.middlegameWeights
+        return ((middlegame[self.indices] * self.signs).sum(axis = 1) * weights + (endgame[self.indices] * self.signs).sum(axis = 1) * (1 - weights) +
+                self.pawnScores)
+
+    #Win probability of white predicted from the evaluations
+    def getWinProbabilities(self, evaluations, scalingConstant = None):
+        k = self.scalingConstant if scalingConstant == None else scalingConstant
+        return 1 / (1 + numpy.power(numpy.float32(10), -k * evaluations / 400))
+
+    #Mean squared error between the results and the predicted win probabilities
+    def getLoss(self, parameters, scalingConstant = None):
+        return float(numpy.mean((self.getWinProbabilities(self.evaluate(parameters), scalingConstant) - self.targets)**2))
+
+    #Fits the scaling constant of the logistic function to the current parameters (golden section search),
+    #so that the tuning changes the evaluation rather than its scale
+    def fitScalingConstant(self, parameters, low = 0.05, high = 5.0, iterations = 40):
+        evaluations = self.evaluate(parameters)
+        loss = lambda k: float(numpy.mean((self.getWinProbabilities(evaluations, k) - self.targets)**2))
+        ratio = (5**0.5 - 1) / 2
+        a, b = high - ratio*(high - low), low + ratio*(high - low)
+        lossA, lossB = loss(a), loss(b)
+        for i in range(iterations):
+            if lossA < lossB:
+                high, b, lossB = b, a, lossA
+                a = high - ratio*(high - low)
+                lossA = loss(a)
+            else:
+                low, a, lossA = a, b, lossB
+                b = low + ratio*(high - low)
+                lossB = loss(b)
+        self.scalingConstant = (low + high) / 2
+        return self.scalingConstant
+
+    #Returns the loss and its gradient with respect to [values, middlegame entries, endgame entries].
+    #The king's value is kept (both sides always have a king), as are entries of squares no piece stands on
+    def getGradient(self, parameters):
+        evaluations = self.evaluate(parameters)
+        probabilities = self.getWinProbabilities(evaluations)
+        errors = probabilities - self.targets
+        #derivative of the mean squared error with respect to each evaluation
+        slopes = 2 * errors * probabilities * (1 - probabilities) * (self.scalingConstant * numpy.log(10) / 400) / len(errors)
+        weighted = slopes[:, None] * self.signs
+        indices = self.indices.ravel()
+        middlegame = numpy.bincount(indices, (weighted * self.middlegameWeights[:, None]).ravel(), self.entries + 1)[:self.entries]
+        endgame = numpy.bincount(indices, (weighted * (1 - self.middlegameWeights[:, None])).ravel(), self.entries + 1)[:self.entries]
+        values = (middlegame + endgame).reshape(6, 64).sum(axis = 1)
+        values[King.index] = 0
+        return [float(numpy.mean(errors**2)), [values, middlegame, endgame]]
+
+    #Minimises the loss with Adam (full passes over all positions); reports the loss every reportInterval epochs (None: silent).
+    #Returns the tuned parameters
+    def tune(self, parameters, epochs = 300, learningRate = 2.0, reportInterval = 25):
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        moments = [[numpy.zeros_like(p) for p in parameters], [numpy.zeros_like(p) for p in parameters]]
+        parameters = [p.copy() for p in parameters]
+        start = time.time()
+        for epoch in range(1, epochs + 1):
+            loss, gradient = self.getGradient(parameters)
+            for i in range(len(parameters)):
+                moments[0][i] = beta1 * moments[0][i] + (1 - beta1) * gradient[i]
+                moments[1][i] = beta2 * moments[1][i] + (1 - beta2) * gradient[i]**2
+                step = learningRate * (moments[0][i] / (1 - beta1**epoch)) / (numpy.sqrt(moments[1][i] / (1 - beta2**epoch)) + epsilon)
+                parameters[i] = parameters[i] - numpy.where(gradient[i] != 0, step, 0)
+            if (reportInterval != None) and ((epoch % reportInterval == 0) or (epoch == epochs)):
+                print("Epoch " + str(epoch) + ": loss " + "%.6f"%loss + ", " + "%.2f"%((time.time() - start) / epoch) + "s per pass", flush = True)
+        return parameters
+
+def main():
+    parser = argparse.ArgumentParser(description = "Texel tuning of the engine's piece values and scoreboards")
+    parser.add_argument('data', nargs = '+', help = "self-play record files (see chessengine.selfplay)")
+    parser.add_argument('--epochs', type = int, default = 300)
+    parser.add_argument('--rate', type = float, default = 2.0, help = "learning rate (centipawns per step)")
+    parser.add_argument('--output', default = getParameterPath(), help = "parameter file to write (default: the one the engine reads at startup)")
+    args = parser.parse_args()
+    start = time.time()
+    try:
+        records = [loadRecords(path) for path in args.data]
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    codes = numpy.concatenate([unpackSquares(r['squares']) for r in records])
+    results = numpy.concatenate([r['result'] for r in records])
+    if len(codes) == 0:
+        parser.error("No positions in " + ", ".join(args.data))
+    tuner = TexelTuner(codes, results)
+    loadTables() #starts from the parameters the engine uses, including those of its parameter file
+    parameters = tuner.getParameters()
+    print(str(len(codes)) + " positions prepared in " + "%.1f"%(time.time() - start) + "s; scaling constant " + "%.3f"%tuner.fitScalingConstant(parameters) +
+          ", initial loss " + "%.6f"%tuner.getLoss(parameters), flush = True)
+    parameters = tuner.tune(parameters, args.epochs, args.rate)
+    tuner.setParameters(parameters)
+    print("Final loss " + "%.6f"%tuner.getLoss(tuner.getParameters()) + " (rounded parameters)")
+    saveParameters(args.output)
+    print("Parameters written to " + args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the analysis cache: keys and stored results
+"""
+
+from chessengine import ChessBoard, Engine, EngineConfig, AnalysisCache
+
+def test_results_are_kept_per_search_settings(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'analysis.db'))
+    cache.store(12345, 2, 1, 4, 30, [[4, 1, 4, 3]])
+    assert cache.get(12345, 2, 1) == [4, 30, [[4, 1, 4, 3]]]
+    assert cache.get(12345, 2, 0) == None
+    assert cache.get(12345, 3, 1) == None
+    cache.close()
+
+def test_promotions_are_kept(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'analysis.db'))
+    cache.store(12345, 2, 1, 3, 870, [[0, 6, 0, 7, 1], [7, 6, 6, 5]])
+    assert cache.get(12345, 2, 1) == [3, 870, [[0, 6, 0, 7, 1], [7, 6, 6, 5]]]
+    #a search whose best move is a promotion is stored, and reused by the next search
+    for nodes in [None, 0]:
+        engine = Engine(1, EngineConfig(randomness = False))
+        engine.verbose = False
+        engine.analysisCache = cache
+        board = ChessBoard()
+        colour = board.setFEN("8/P6k/8/8/8/8/6pK/8 w - - 0 1")
+        assert engine.calculateMove_FixedDepth(board, colour, 3) == [0, 6, 0, 7, 4]
+        assert (nodes == None) or (engine.nodes == nodes)
+    assert cache.get(board.getHash(colour), engine.quiescenceLimit, engine.extensionLimit)[2][0] == [0, 6, 0, 7, 4]
+    cache.close()
+
+def test_randomised_searches_are_not_stored(tmp_path):
+    cache = AnalysisCache(str(tmp_path / 'analysis.db'))
+    for randomness in [True, False]:
+        engine = Engine(1, EngineConfig(randomness = randomness))
+        engine.verbose = False
+        engine.analysisCache = cache
+        engine.calculateMove_FixedDepth(ChessBoard(), 0, 2)
+    assert len(cache) == 1
+    cache.close()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the board: lookup tables, draws by repetition and the fifty-move rule
+"""
+
+import threading, time
+import chessengine.board
+from chessengine import ChessBoard, Engine, EngineConfig, Colour
+from chessengine.board import getMoveName
+from chessengine.evaluation import PieceSquareTables
+
+#Plays the moves (names) on the board from the position of colour and returns the colour to move
+def playMoves(board, colour, names):
+    for name in names:
+        moves = {getMoveName(move): move for move in board.generateMoveList(colour)}
+        board.move(*moves[name])
+        colour = not colour
+    return colour
+
+def test_tables_are_loaded_once_across_threads(monkeypatch):
+    built = []
+    class SlowPieceSquareTables(PieceSquareTables):
+        def __init__(self):
+            built.append(self)
+            time.sleep(0.2) #other threads set up their boards meanwhile
+            PieceSquareTables.__init__(self)
+    monkeypatch.setattr(chessengine.board, 'PieceSquareTables', SlowPieceSquareTables)
+    for name in ['zobrist', 'pieceSquareTables', 'tablesLoaded']:
+        monkeypatch.setattr(chessengine.board, name, getattr(chessengine.board, name))
+    chessengine.board.tablesLoaded = False
+    errors = []
+    def setUpBoard():
+        try:
+            ChessBoard().getHash(Colour.White)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target = setUpBoard) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (errors == []) and (len(built) == 1)
+
+def test_threefold_repetition():
+    board = ChessBoard()
+    colour = playMoves(board, Colour.White, ['g1f3', 'g8f6', 'f3g1', 'f6g8'])
+    assert (board.countRepetitions() == 1) and not board.isThreefoldRepetition()
+    #a single repetition within the search path is a draw for the search
+    assert board.isDrawByRule(0, colour) and not board.isDrawByRule(len(board.hashHistory), colour)
+    colour = playMoves(board, colour, ['g1f3', 'g8f6', 'f3g1'])
+    assert not board.isThreefoldRepetition()
+    colour = playMoves(board, colour, ['f6g8'])
+    assert board.isThreefoldRepetition() and board.isDrawByRule(len(board.hashHistory), colour)
+
+def test_fifty_move_rule():
+    board = ChessBoard()
+    colour = board.setFEN("8/8/8/4k3/8/8/8/R3K3 w - - 98 80")
+    colour = playMoves(board, colour, ['a1a2'])
+    assert not board.isFiftyMoveRule(colour)
+    colour = playMoves(board, colour, ['e5e4'])
+    assert board.isFiftyMoveRule(colour) and board.isDrawByRule(len(board.hashHistory), colour)
+    #a capture or pawn move resets the clock
+    board.setFEN("8/8/8/4k3/8/8/4P3/R3K3 w - - 99 80")
+    assert board.halfmoveClock == 99
+    playMoves(board, Colour.White, ['e2e3'])
+    assert board.halfmoveClock == 0
+
+def test_checkmate_on_the_hundredth_halfmove_is_no_draw():
+    board = ChessBoard()
+    colour = playMoves(board, board.setFEN("6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80"), ['a1a8'])
+    assert board.halfmoveClock == 100
+    assert board.isCheckmate(colour) and not board.isFiftyMoveRule(colour) and not board.isDrawByRule(len(board.hashHistory), colour)
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board.setFEN("6k1/5ppp/8/8/8/8/8/R5K1 w - - 99 80")
+    assert getMoveName(engine.calculateMove_FixedDepth(board, Colour.White, 3)) == 'a1a8'
+
+def test_search_plays_legal_moves_at_the_fifty_move_limit():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    colour = board.setFEN("q3r1k1/8/8/8/8/8/4q3/2N1K3 w - - 99 80")
+    for depth in [1, 2, 3]:
+        assert getMoveName(engine.calculateMove_FixedDepth(board, colour, depth)) == 'c1e2'
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the engine configuration: validation and memory budget
+"""
+
+import random, tracemalloc
+import pytest
+from chessengine import EngineConfig
+from chessengine.evaluation import PawnHashTable, EvaluationCache
+from chessengine.transposition import TranspositionTable
+
+@pytest.mark.parametrize('settings', [{'unknown': 1}, {'hashSize': '4'}, {'hashSize': 0}, {'hashSize': float('inf')}, {'hashSize': 0.001},
+                                      {'evalCachePolicy': 'fifo'}, {'pawnTableSize': 0}, {'quiescenceLimit': -1}, {'randomMode': 'seeded'}])
+def test_invalid_settings_raise_value_error(settings):
+    with pytest.raises(ValueError):
+        EngineConfig(**settings)
+
+def test_tables_fit_the_budget():
+    config = EngineConfig(hashSize = 16, evalCacheSize = 4096, evalCachePolicy = 'lru')
+    assert config.getMemoryFootprint() <= 16 * 2**20
+    assert config.getTableSizes()[1:] == [16384, 4096]
+
+#The tables of full caches take no more memory than the budget (measured with tracemalloc)
+@pytest.mark.parametrize('policy, evalCacheSize', [('lru', 16000), ('lru', 11000), ('replace', 16000)])
+def test_full_tables_fit_the_budget(policy, evalCacheSize):
+    config = EngineConfig(hashSize = 8, evalCacheSize = evalCacheSize, evalCachePolicy = policy)
+    transpositionTableSize, pawnTableSize, evalCacheSize = config.getTableSizes()
+    rng = random.Random(5)
+    tracemalloc.start()
+    try:
+        tables = [TranspositionTable(transpositionTableSize), PawnHashTable(pawnTableSize), EvaluationCache(evalCacheSize, policy)]
+        for i in range(2*pawnTableSize):
+            tables[1].store(rng.getrandbits(64), [rng.randint(-300, 300), rng.randint(-300, 300)])
+        for i in range(2*evalCacheSize):
+            tables[2].store(rng.getrandbits(64), rng.randint(-3000, 3000))
+        assert tracemalloc.get_traced_memory()[0] <= 8 * 2**20
+    finally:
+        tracemalloc.stop()
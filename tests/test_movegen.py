@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the move generation: perft counts of standard positions, piece lists, castling, en passant and promotions
+"""
+
+import random
+import pytest
+from chessengine import ChessBoard, Colour, King, Rook, Knight, Pawn, Engine, EngineConfig
+from chessengine.board import getMoveName, parseMoveName
+from chessengine.transposition import TranspositionTable
+
+#Returns the number of leaf positions of the legal move tree of the given depth
+def perft(board, colour, depth):
+    if depth == 0:
+        return 1
+    count = 0
+    for mov in board.generateMoveList(colour):
+        move = board.move(*mov)
+        count = count + perft(board, not colour, depth - 1)
+        board.revertMove(move)
+    return count
+
+#Positions with their perft counts, from https://www.chessprogramming.org/Perft_Results
+@pytest.mark.parametrize('fen, depth, count', [
+    ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", 3, 8902),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 2, 2039),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 4, 43238),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3, 9467),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 2, 1486),
+    ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", 2, 2079)])
+def test_perft(fen, depth, count):
+    board = ChessBoard()
+    colour = board.setFEN(fen)
+    hash = board.getHash(colour)
+    assert perft(board, colour, depth) == count
+    #every move is reverted completely
+    assert (board.getFEN(colour) == fen) and (board.getHash(colour) == hash)
+    for square in range(128):
+        assert board.cells[square] == (None if square & 0x88 else board.squares[square & 7][square >> 4])
+
+#Checks that the piece lists and king locations of the board agree with its squares
+def checkPieceLists(board):
+    for colour in [Colour.White, Colour.Black]:
+        locations = [(x, y) for x in range(8) for y in range(8) if (board.squares[x][y] != None) and (board.squares[x][y].colour == colour)]
+        assert sorted(board.getPieceLocations(colour)) == locations
+    for x, y in [board.kingWhiteLocation, board.kingBlackLocation]:
+        assert isinstance(board.squares[x][y], King)
+
+def test_piece_lists_follow_moves_and_reversals():
+    rng = random.Random(42)
+    for game in range(5):
+        board = ChessBoard()
+        colour = board.setFEN("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1" if game % 2 else
+                              "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+        fen = board.getFEN(colour)
+        moves = []
+        for ply in range(80):
+            legalMoves = board.generateMoveList(colour)
+            if legalMoves == []:
+                break
+            moves.append(board.move(*rng.choice(legalMoves)))
+            colour = not colour
+            checkPieceLists(board)
+        for move in reversed(moves):
+            board.revertMove(move)
+            colour = not colour
+            checkPieceLists(board)
+        assert board.getFEN(colour) == fen
+
+#Makes the move (name) on the board, which must be legal for colour, and returns the move data
+def makeMove(board, colour, name):
+    moves = {getMoveName(move): move for move in board.generateMoveList(colour)}
+    assert name in moves
+    return board.move(*moves[name])
+
+@pytest.mark.parametrize('name, castling', [('e1f1', 'kq'), ('h1h2', 'Qkq'), ('a1a8', 'Kk'), ('h1h8', 'Qq'), ('e1g1', 'kq'), ('e1c1', 'kq')])
+def test_castling_rights(name, castling):
+    board = ChessBoard()
+    fen = "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"
+    board.setFEN(fen)
+    hash = board.getHash(Colour.White)
+    move = makeMove(board, Colour.White, name)
+    assert board.getFEN(Colour.Black).split()[2] == castling
+    board.revertMove(move)
+    assert (board.getFEN(Colour.White) == fen) and (board.getHash(Colour.White) == hash)
+
+def test_castling_moves_the_rook():
+    board = ChessBoard()
+    board.setFEN("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1")
+    makeMove(board, Colour.White, 'e1g1')
+    makeMove(board, Colour.Black, 'e8c8')
+    assert board.getFEN(Colour.White).split()[0] == "2kr3r/8/8/8/8/8/8/R4RK1"
+    assert isinstance(board.squares[5][0], Rook) and isinstance(board.squares[3][7], Rook)
+
+def test_no_castling_out_of_or_through_check():
+    board = ChessBoard()
+    board.setFEN("r3k2r/8/8/8/8/8/5r2/R3K2R w KQkq - 0 1") #the rook on f2 attacks f1
+    names = [getMoveName(move) for move in board.generateMoveList(Colour.White)]
+    assert ('e1c1' in names) and not ('e1g1' in names)
+    board.setFEN("r3k2r/8/8/8/8/8/4r3/R3K2R w KQkq - 0 1") #in check
+    names = [getMoveName(move) for move in board.generateMoveList(Colour.White)]
+    assert not (('e1c1' in names) or ('e1g1' in names))
+
+def test_en_passant():
+    board = ChessBoard()
+    board.setFEN("4k3/3p4/8/4P3/8/8/8/4K3 b - - 0 1")
+    makeMove(board, Colour.Black, 'd7d5')
+    fen = board.getFEN(Colour.White)
+    assert fen.split()[3] == 'd6'
+    hash = board.getHash(Colour.White)
+    move = makeMove(board, Colour.White, 'e5d6')
+    assert move.isEnPassant and (board.squares[3][4] == None) and (board.getFEN(Colour.Black).split()[0] == "4k3/8/3P4/8/8/8/8/4K3")
+    board.revertMove(move)
+    assert (board.getFEN(Colour.White) == fen) and (board.getHash(Colour.White) == hash)
+    #the right expires after one move
+    makeMove(board, Colour.White, 'e1e2')
+    makeMove(board, Colour.Black, 'e8e7')
+    assert not 'e5d6' in [getMoveName(move) for move in board.generateMoveList(Colour.White)]
+
+def test_underpromotions():
+    board = ChessBoard()
+    fen = "8/3q1P1k/8/8/8/8/8/K7 w - - 0 1"
+    colour = board.setFEN(fen)
+    hash = board.getHash(colour)
+    names = sorted([getMoveName(move) for move in board.generateMoveList(colour) if move[1] == 6])
+    assert names == ['f7f8b', 'f7f8n', 'f7f8q', 'f7f8r']
+    assert parseMoveName('f7f8n') == [5, 6, 5, 7, Knight.index]
+    move = board.move(*parseMoveName('f7f8n'))
+    assert move.validMove and isinstance(board.squares[5][7], Knight) and (board.getFEN(Colour.Black).split()[0] == "5N2/3q3k/8/8/8/8/8/K7")
+    board.revertMove(move)
+    assert isinstance(board.squares[5][6], Pawn) and (board.getFEN(colour) == fen) and (board.getHash(colour) == hash)
+    #the transposition table keeps the promotion piece
+    table = TranspositionTable(1024)
+    table.store(hash, [5, 6, 5, 7, Knight.index])
+    assert table.getMove(hash) == [5, 6, 5, 7, Knight.index]
+    #the knight promotion forks king and queen
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    assert getMoveName(engine.calculateMove_FixedDepth(board, colour, 3)) == 'f7f8n'
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the PGN export and import
+"""
+
+import random
+from chessengine import ChessBoard, Colour
+from chessengine.pgn import PGNWriter, readPGN, getSANName, parseSANName
+
+def test_san_names():
+    board = ChessBoard()
+    colour = board.setFEN("4k3/8/8/8/8/8/8/R3K2R w KQ - 0 1")
+    names = [getSANName(board, move, colour) for move in board.generateMoveList(colour)]
+    assert {'O-O', 'O-O-O', 'Ra8+', 'Rf1', 'Kd2'} <= set(names)
+    colour = board.setFEN("k7/8/8/8/8/2N3N1/8/4K3 w - - 0 1") #both knights reach e2 and e4
+    names = [getSANName(board, move, colour) for move in board.generateMoveList(colour)]
+    assert {'Nce2', 'Nge2', 'Nce4', 'Nge4', 'Nd5'} <= set(names)
+    colour = board.setFEN("2r1k3/1P6/8/8/8/8/8/4K3 w - - 0 1")
+    names = [getSANName(board, move, colour) for move in board.generateMoveList(colour)]
+    assert {'b8=Q', 'b8=N', 'bxc8=R+', 'bxc8=B'} <= set(names)
+    assert parseSANName(board, 'bxc8=N', colour) == [1, 6, 2, 7, 1]
+    assert parseSANName(board, 'b8N', colour) == [1, 6, 1, 7, 1]
+    assert parseSANName(board, 'Kxe8', colour) == None
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'games.pgn')
+    rng = random.Random(7)
+    writer = PGNWriter(path, "Test games", "tests")
+    games = []
+    for game in range(10):
+        board = ChessBoard()
+        colour = Colour.White
+        if game % 2:
+            colour = board.setFEN("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1")
+        writer.startGame(board, colour, "White " + str(game), "Black " + str(game))
+        moves = []
+        for ply in range(120):
+            legalMoves = board.generateMoveList(colour)
+            if legalMoves == []:
+                break
+            move = rng.choice(legalMoves)
+            writer.addMove(board, move, colour, "ply " + str(ply) if ply % 7 == 0 else None)
+            board.move(*move)
+            moves.append(move)
+            colour = not colour
+        result = ["1-0", "0-1", "1/2-1/2", "*"][game % 4]
+        writer.endGame(result)
+        games.append([moves, result, board.getFEN(colour), colour])
+    writer.close()
+    board = ChessBoard()
+    count = 0
+    for [tags, moves, result], [writtenMoves, writtenResult, fen, colour] in zip(readPGN(path, board), games):
+        assert (moves == writtenMoves) and (result == writtenResult)
+        assert (tags['White'] == "White " + str(count)) and (tags['Event'] == "Test games")
+        assert board.getFEN(colour) == fen
+        count = count + 1
+    assert count == 10
+
+def test_comments_variations_and_annotations_are_skipped(tmp_path):
+    path = tmp_path / 'annotated.pgn'
+    path.write_text('[Event "Annotated"]\n[Result "1-0"]\n\n1. e4 {best by test} e5 2. Nf3 $1 (2. f4 exf4 (2... d5)) Nc6 3. Bb5!? a6 ; a comment\n4. Ba4 1-0\n\n'
+                    '[Event "Unfinished"]\n\n1. d4 d5 *\n')
+    games = [[tags, moves, result] for tags, moves, result in readPGN(str(path))]
+    assert [game[0]['Event'] for game in games] == ["Annotated", "Unfinished"]
+    assert (len(games[0][1]) == 7) and (games[0][2] == "1-0")
+    assert (games[1][1] == [[3, 1, 3, 3], [3, 6, 3, 4]]) and (games[1][2] == "*")
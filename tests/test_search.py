@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the search: principal variations, Multi-PV lines, the end of iterative deepening and pondering
+"""
+
+from chessengine import ChessBoard, Engine, EngineConfig, AnalysisCache, Ponderer, Colour
+from chessengine.board import getMoveName
+from chessengine.service import parseRequest, analysePosition
+
+fens = ["6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1", #back-rank mate in one
+        "r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 0 1", #scholar's mate in one
+        "6k1/5ppp/8/8/8/8/8/R5K1 b - - 0 1",
+        "7k/6pp/8/8/8/8/8/KQ4R1 w - - 0 1",
+        "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+        "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+        "8/P6k/8/8/8/8/6pK/8 b - - 0 1"]
+
+#Plays the moves (names) on the board from the position of colour, each of which must be a legal move
+def replayLine(board, colour, line):
+    for name in line:
+        moves = {getMoveName(move): move for move in board.generateMoveList(colour)}
+        assert name in moves, name + " of " + str(line) + " is not legal in " + board.getFEN(colour)
+        board.move(*moves[name])
+        colour = not colour
+
+def test_principal_variations_are_legal():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    for fen in fens:
+        for depth in [2, 3, 4]:
+            result = analysePosition(engine, board, parseRequest({'fen': fen, 'depth': depth, 'multipv': 2}))
+            assert result['pv'][0] == result['bestmove']
+            for line in [result['pv']] + [line['pv'] for line in result['lines']]:
+                lineBoard = ChessBoard()
+                replayLine(lineBoard, lineBoard.setFEN(fen), line)
+
+def test_mate_line_ends_with_the_mate():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    result = analysePosition(engine, board, parseRequest({'fen': fens[0], 'depth': 3}))
+    assert result['pv'] == ['a1a8']
+    result = analysePosition(engine, board, parseRequest({'fen': fens[1], 'depth': 3}))
+    assert result['pv'] == ['h5f7']
+
+def test_cached_result_has_no_lines_of_an_earlier_search(tmp_path):
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    engine.analysisCache = AnalysisCache(str(tmp_path / 'analysis.db'))
+    board = ChessBoard()
+    for depth in [2, 3]:
+        analysePosition(engine, board, parseRequest({'fen': fens[4], 'depth': depth}))
+        result = analysePosition(engine, board, parseRequest({'fen': fens[5], 'depth': 2, 'multipv': 3}))
+        assert len(result['lines']) == 3
+        result = analysePosition(engine, board, parseRequest({'fen': fens[4], 'depth': 2}))
+        assert result['cached'] and (result['lines'] == [])
+    engine.analysisCache.close()
+
+def test_deepening_stops_at_a_proven_mate():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    colour = board.setFEN(fens[0])
+    assert engine.calculateMove_IterativeDeepening(board, colour, 30) == [0, 0, 0, 7]
+    assert (engine.completedDepth == 2) and (engine.bestValue > 99000)
+
+def test_no_move_without_legal_moves():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    for fen in ["R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1", "7k/5Q2/6K1/8/8/8/8/8 b - - 0 1"]: #checkmate, stalemate
+        colour = board.setFEN(fen)
+        assert engine.calculateMove_IterativeDeepening(board, colour, 30) == None
+        assert engine.calculateMove_FixedDepth(board, colour, 3) == None
+
+def test_no_pondering_after_the_game_ends():
+    engine = Engine(1, EngineConfig(randomness = False))
+    engine.verbose = False
+    board = ChessBoard()
+    board.setFEN("r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 1")
+    ponder = Ponderer()
+    assert not ponder.start(board, Colour.Black, [6, 7, 5, 5], [7, 4, 5, 6], engine) #g8f6, h5f7 mates
+    assert not ponder.isActive()
+    assert ponder.start(board, Colour.Black, [6, 7, 5, 5], [3, 1, 3, 2], engine) #g8f6, d2d3
+    assert ponder.isActive()
+    ponder.stop()
+    assert not ponder.isActive()
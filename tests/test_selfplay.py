@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the self-play training data: record layout, file handling and reproducible games
+"""
+
+import pytest
+from chessengine import ChessBoard, Colour, EngineConfig
+from chessengine import selfplay
+from chessengine.selfplay import encodeRecord, decodeRecord, encodeSquares, recordSize, scoreLimit, openForAppend, readRecords, SelfPlaySettings
+
+def test_record_round_trip():
+    board = ChessBoard()
+    colour = board.setFEN("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 b kq - 0 1")
+    data = encodeRecord(board, colour, -125, -1, 37)
+    assert len(data) == recordSize == 40
+    codes, side, result, score, ply = decodeRecord(data)
+    assert [side, result, score, ply] == [Colour.Black, -1, -125, 37]
+    for x in range(8):
+        for y in range(8):
+            piece = board.squares[x][y]
+            assert codes[8*x + y] == (0 if piece == None else 1 + 2*piece.index + piece.colour)
+    #scores are clipped to the range of the record
+    assert decodeRecord(encodeRecord(board, colour, 99999, 1, 0))[3] == scoreLimit
+    assert decodeRecord(encodeRecord(board, colour, -99999, 1, 0))[3] == -scoreLimit
+
+def test_file_append_and_read(tmp_path):
+    path = str(tmp_path / 'data.bin')
+    board = ChessBoard()
+    for ply in range(3):
+        file = openForAppend(path)
+        file.write(encodeRecord(board, Colour.White, 10*ply, 0, ply))
+        file.close()
+    records = list(readRecords(path))
+    assert [record[4] for record in records] == [0, 1, 2]
+    assert [record[3] for record in records] == [0, 10, 20]
+    #loadRecords maps the same records
+    numpy = pytest.importorskip('numpy')
+    array = selfplay.loadRecords(path)
+    assert (len(array) == 3) and (list(array['score']) == [0, 10, 20])
+    assert numpy.array_equal(selfplay.unpackSquares(array['squares'])[1], numpy.array(records[1][0], dtype = numpy.uint8))
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / 'data.bin')
+    openForAppend(path).close()
+    assert list(readRecords(path)) == []
+    pytest.importorskip('numpy')
+    assert len(selfplay.loadRecords(path)) == 0
+
+@pytest.mark.parametrize('content', [b'', b'PCS', b'PCSPxxxxxxxx', selfplay.fileHeader.pack(b'PCSP', 1, recordSize) + b'\x00'])
+def test_other_files_are_rejected(tmp_path, content):
+    path = tmp_path / 'data.bin'
+    path.write_bytes(content)
+    with pytest.raises(ValueError):
+        list(readRecords(str(path)))
+    if content != b'':
+        with pytest.raises(ValueError):
+            openForAppend(str(path))
+
+def test_unknown_setting_raises_value_error():
+    with pytest.raises(ValueError):
+        SelfPlaySettings(samplerate = 0.5)
+
+def test_games_follow_from_their_seed():
+    selfplay.initWorker(EngineConfig(randomness = False), SelfPlaySettings(depth = 1, randomPlies = 4, sampleRate = 0.5, maxPlies = 30))
+    first = selfplay.playGame(3)
+    assert first == selfplay.playGame(3)
+    records, plies, result = first
+    assert (len(records) % recordSize == 0) and (0 < plies <= 30) and (result in [-1, 0, 1])
+    for i in range(len(records) // recordSize):
+        assert decodeRecord(records[i*recordSize:(i + 1)*recordSize])[4] >= 4
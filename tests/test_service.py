@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Tests of the analysis service: request limits
+"""
+
+import json, threading, time, urllib.request
+from chessengine.service import parseRequest, EnginePool, AnalysisServer
+
+def test_parse_request_caps_every_search():
+    assert parseRequest({}, 1000, 60000)['movetime'] == 1000
+    assert parseRequest({'movetime': 90000}, 1000, 60000)['movetime'] == 60000
+    #depth and node limits only end a search earlier, they never lift the time cap
+    request = parseRequest({'depth': 40}, 1000, 60000)
+    assert (request['movetime'] == 60000) and (request['depth'] == 40)
+    request = parseRequest({'nodes': 10**9, 'movetime': 500}, 1000, 60000)
+    assert (request['movetime'] == 500) and (request['nodes'] == 10**9)
+
+def test_deep_request_is_capped():
+    pool = EnginePool(1)
+    server = AnalysisServer(('127.0.0.1', 0), pool)
+    server.maxMoveTime = 300
+    thread = threading.Thread(target = server.serve_forever, daemon = True)
+    thread.start()
+    try:
+        request = urllib.request.Request('http://127.0.0.1:' + str(server.server_address[1]) + '/analyse',
+                                         json.dumps({'depth': 40}).encode(), {'Content-Type': 'application/json'})
+        start = time.time()
+        with urllib.request.urlopen(request, timeout = 30) as response:
+            result = json.loads(response.read())
+        assert time.time() - start < 5
+        assert result['searchTime'] < 2000
+        assert result['bestmove'] != None
+    finally:
+        server.shutdown()
+        server.server_close()
+        pool.close()